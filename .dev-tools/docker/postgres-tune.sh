@@ -0,0 +1,61 @@
+#!/bin/bash
+# Print PostgreSQL settings sized from the memory and CPUs available to the container.
+# Included by pg-odoo.conf before postgresql.conf, so manual overrides there still win.
+#
+#   PG_MEMORY_MB        memory to size for (default: cgroup limit, else half the host memory)
+#   PG_MAX_CONNECTIONS  connection limit (default: 300)
+
+# Memory in MB: explicit, cgroup limit, or half of the host memory shared with Odoo
+MEMORY_MB="$PG_MEMORY_MB"
+if [ -z "$MEMORY_MB" ]; then
+  LIMIT=$(cat /sys/fs/cgroup/memory.max 2>/dev/null || echo max)
+  if [ "$LIMIT" != "max" ]; then
+    MEMORY_MB=$(( LIMIT / 1024 / 1024 ))
+  else
+    MEMORY_MB=$(awk '/^MemTotal:/ {printf "%d\n", $2 / 1024 / 2}' /proc/meminfo)
+  fi
+fi
+
+# CPUs, honouring a cgroup CPU quota
+if read -r QUOTA PERIOD 2>/dev/null < /sys/fs/cgroup/cpu.max && [ "$QUOTA" != "max" ]; then
+  CPUS=$(( (QUOTA + PERIOD - 1) / PERIOD ))
+else
+  CPUS=$(nproc)
+fi
+
+MAX_CONNECTIONS=${PG_MAX_CONNECTIONS:-300}
+SHARED_BUFFERS_MB=$(( MEMORY_MB / 4 ))
+EFFECTIVE_CACHE_MB=$(( MEMORY_MB * 3 / 4 ))
+MAINTENANCE_WORK_MEM_MB=$(( MEMORY_MB / 16 ))
+[ $MAINTENANCE_WORK_MEM_MB -gt 2048 ] && MAINTENANCE_WORK_MEM_MB=2048
+PARALLEL_PER_GATHER=$(( CPUS / 2 ))
+[ $PARALLEL_PER_GATHER -lt 1 ] && PARALLEL_PER_GATHER=1
+[ $PARALLEL_PER_GATHER -gt 4 ] && PARALLEL_PER_GATHER=4
+# Each connection may run a few sorts/hashes at once, each parallel worker its own
+WORK_MEM_KB=$(( (MEMORY_MB - SHARED_BUFFERS_MB) * 1024 / (MAX_CONNECTIONS * 3) / PARALLEL_PER_GATHER ))
+[ $WORK_MEM_KB -lt 4096 ] && WORK_MEM_KB=4096
+
+cat <<EOF
+# Generated by postgres-tune.sh for ${MEMORY_MB}MB of memory and ${CPUS} CPUs
+max_connections = ${MAX_CONNECTIONS}
+shared_buffers = ${SHARED_BUFFERS_MB}MB
+effective_cache_size = ${EFFECTIVE_CACHE_MB}MB
+maintenance_work_mem = ${MAINTENANCE_WORK_MEM_MB}MB
+work_mem = ${WORK_MEM_KB}kB
+wal_buffers = 16MB
+min_wal_size = 1GB
+max_wal_size = 4GB
+checkpoint_completion_target = 0.9
+random_page_cost = 1.1
+effective_io_concurrency = 200
+max_worker_processes = $(( CPUS > 8 ? CPUS : 8 ))
+max_parallel_workers = ${CPUS}
+max_parallel_workers_per_gather = ${PARALLEL_PER_GATHER}
+max_parallel_maintenance_workers = ${PARALLEL_PER_GATHER}
+
+# Query statistics, reported by 'odoo dbstats'
+shared_preload_libraries = 'pg_stat_statements'
+pg_stat_statements.max = 10000
+pg_stat_statements.track = top
+track_io_timing = on
+EOF
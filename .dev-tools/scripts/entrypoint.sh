@@ -22,15 +22,23 @@ fi
 ###############################################
 # Port Allocation (for shell and tests)
 ###############################################
-while true; do
-  # Generate a random ephemeral port and its GEVENT partner
-  PORT=$(shuf -i 4000-4100 -n 1)
-  ((GEVENT_PORT = PORT + 1))
-
-  (echo >/dev/tcp/localhost/$PORT) &>/dev/null && PORT_IN_USE=0 || PORT_IN_USE=1
-  (echo >/dev/tcp/localhost/$GEVENT_PORT) &>/dev/null && GEVENT_PORT_IN_USE=0 || GEVENT_PORT_IN_USE=1
-  [ $PORT_IN_USE -ne 0 ] && [ $GEVENT_PORT_IN_USE -ne 0 ] && break
-done
+RESERVED_PORTS=" "
+allocate_ports() {
+  while true; do
+    # Generate a random ephemeral port and its GEVENT partner
+    PORT=$(shuf -i 4000-4100 -n 1)
+    ((GEVENT_PORT = PORT + 1))
+
+    # Skip ports already handed out to another test job of this run
+    [[ "$RESERVED_PORTS" == *" $PORT "* || "$RESERVED_PORTS" == *" $GEVENT_PORT "* ]] && continue
+
+    (echo >/dev/tcp/localhost/$PORT) &>/dev/null && PORT_IN_USE=0 || PORT_IN_USE=1
+    (echo >/dev/tcp/localhost/$GEVENT_PORT) &>/dev/null && GEVENT_PORT_IN_USE=0 || GEVENT_PORT_IN_USE=1
+    [ $PORT_IN_USE -ne 0 ] && [ $GEVENT_PORT_IN_USE -ne 0 ] && break
+  done
+  RESERVED_PORTS+="$PORT $GEVENT_PORT "
+}
+allocate_ports
 
 ###############################################
 # Helper Functions
@@ -51,16 +59,7 @@ cleanup_tests() {
 
   echo "Dropping test database ${test_db}." | tee -a "$logfile"
   PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -c "DROP DATABASE IF EXISTS \"${test_db}\";" 2>/dev/null || echo "Warning: Could not drop database ${test_db}" | tee -a "$logfile"
-
-  # Check for other ongoing Odoo test processes before resetting PostgreSQL settings
-  local test_procs=$(ps aux | grep -v grep | grep '[o]doo-bin.*--test-enable' | grep -o 'testing-[A-Za-z0-9]\{6\}' | grep -v "$test_db" | sort -u | wc -l || echo 0)
-  if [ $test_procs -gt 0 ]; then
-    echo "Skipping reset PostgreSQL settings because there are $test_procs other test processes running." | tee -a "$logfile"
-  else
-    echo "No other test processes found. Restoring PostgreSQL settings..." | tee -a "$logfile"
-    PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -c "ALTER SYSTEM RESET ALL;" 2>/dev/null || echo "Warning: Could not reset PostgreSQL config." | tee -a "$logfile"
-    PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -c "SELECT pg_reload_conf();" 2>/dev/null || echo "Warning: Could not reload PostgreSQL configuration" | tee -a "$logfile"
-  fi
+  rm -rf "${DATA_DIR}/filestore/${test_db}"
 
   echo "Cleanup completed." | tee -a "$logfile"
 }
@@ -68,6 +67,10 @@ cleanup_tests() {
 parse_extra_args() {
   INSTALL_ALL=0
   USER_TEST_TAGS=""
+  # Opt-in: the tests of the template's dependency modules do not run in template mode
+  USE_TEMPLATE=0
+  REBUILD_TEMPLATE=0
+  TEST_JOBS=1
   ARGS=()
 
   while [[ $# -gt 0 ]]; do
@@ -76,6 +79,28 @@ parse_extra_args() {
             INSTALL_ALL=1
             shift
             ;;
+        --template)
+            USE_TEMPLATE=1
+            shift
+            ;;
+        --no-template)
+            USE_TEMPLATE=0
+            shift
+            ;;
+        --rebuild-template)
+            USE_TEMPLATE=1
+            REBUILD_TEMPLATE=1
+            shift
+            ;;
+        --jobs|--jobs=*)
+            if [ "$1" = "--jobs" ]; then
+              TEST_JOBS="$2"
+              shift
+            else
+              TEST_JOBS="${1#*=}"
+            fi
+            shift
+            ;;
         --test-tags|--test-tags=*)
             USER_TEST_TAGS=",${1#*=}"
             shift
@@ -88,12 +113,342 @@ parse_extra_args() {
   done
 }
 
+run_psql() {
+  PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -tAq -v ON_ERROR_STOP=1 -c "$1"
+}
+
+# Exit unless $1 is a plain snapshot name, which is used as a directory under DATA_DIR/snapshots
+check_snapshot_name() {
+  if ! [[ "$1" =~ ^[A-Za-z0-9_][A-Za-z0-9_.-]*$ ]]; then
+    echo "Error: invalid snapshot name '$1' (use letters, digits, '_', '.' and '-')" >&2
+    exit 1
+  fi
+}
+
+# Non-custom modules the given custom modules depend on, i.e. the content of their test template
+template_dependencies() {
+  ${PYTHON_BIN} - "$1" <<'PYTHON'
+import ast
+import os
+import sys
+
+root = '/custom-odoo'
+custom = {name for name in os.listdir(root) if os.path.isfile(os.path.join(root, name, '__manifest__.py'))}
+todo, seen, dependencies = [name for name in sys.argv[1].split(',') if name], set(), set()
+while todo:
+    module = todo.pop()
+    if module in seen:
+        continue
+    seen.add(module)
+    if module not in custom:
+        dependencies.add(module)
+        continue
+    with open(os.path.join(root, module, '__manifest__.py')) as manifest:
+        todo.extend(ast.literal_eval(manifest.read()).get('depends', []))
+print(','.join(sorted(dependencies)) or 'base')
+PYTHON
+}
+
+# Fingerprint of a template: its modules plus the size and mtime of every Odoo source file
+test_template_key() {
+  {
+    echo "$1"
+    find /odoo /odoo-e -name .git -prune -o -type f -printf '%p %s %T@\n' 2>/dev/null | sort
+  } | sha256sum | cut -c1-12
+}
+
+drop_test_template() {
+  run_psql "ALTER DATABASE \"$1\" WITH IS_TEMPLATE false;" 2>/dev/null || true
+  run_psql "DROP DATABASE IF EXISTS \"$1\";" 2>/dev/null || echo "Warning: Could not drop database $1"
+  rm -rf "${DATA_DIR}/filestore/$1"
+}
+
+# Lift the server-wide timeouts for database $1 only, so long installs and tests are not aborted
+configure_test_database() {
+  local db="$1"
+  local logfile="$2"
+
+  echo "Configuring PostgreSQL settings of ${db}..." | tee -a "$logfile"
+  run_psql "ALTER DATABASE \"${db}\" SET lock_timeout = 0;" || echo "Warning: Could not set lock_timeout" | tee -a "$logfile"
+  run_psql "ALTER DATABASE \"${db}\" SET statement_timeout = 0;" || echo "Warning: Could not set statement_timeout" | tee -a "$logfile"
+  run_psql "ALTER DATABASE \"${db}\" SET idle_in_transaction_session_timeout = 1800000;" || echo "Warning: Could not set idle_in_transaction_session_timeout" | tee -a "$logfile"
+}
+
+# Create database $1 from a cached template with the dependencies of modules $2 installed.
+# Templates are rebuilt whenever the dependency set or the Odoo sources change, and only
+# the TEST_TEMPLATE_KEEP (default 3) most recently used ones are kept.
+prepare_test_database() {
+  local test_db="$1"
+  local modules="$2"
+  local logfile="$3"
+  local dependencies template build_db cmd
+
+  dependencies=$(template_dependencies "$modules") || return 1
+  template="test-template-$(test_template_key "$dependencies")"
+
+  if [ $REBUILD_TEMPLATE -eq 1 ]; then
+    drop_test_template "$template"
+  fi
+
+  if [ -z "$(run_psql "SELECT 1 FROM pg_database WHERE datname = '${template}'")" ]; then
+    build_db="${template}-build-$$"
+    printf "%s\nBuilding test template %s with: %s\n%s\n" "$SEP" "$template" "$dependencies" "$SEP" | tee -a "$logfile"
+    # Created up front so the install runs without the server-wide timeouts; Odoo
+    # initializes an existing empty database when asked to install modules
+    if ! run_psql "CREATE DATABASE \"${build_db}\" ENCODING 'unicode' LC_COLLATE 'C' TEMPLATE template0;"; then
+      echo "Warning: Could not create ${build_db}, installing from scratch." | tee -a "$logfile"
+      return 1
+    fi
+    configure_test_database "$build_db" "$logfile"
+    cmd="${PYTHON_BIN} ${ODOO_BIN} ${CMD_BASE} -d ${build_db} -i ${dependencies} \
+      --http-port=${PORT} --gevent-port=${GEVENT_PORT} --max-cron-threads=0 --stop-after-init"
+    if ! ${RUNAS} "SUPPRESS_FS_ERR=0 INSTALL_THEME=0 ${cmd}" 2>&1 | ansifilter -r -a >> "$logfile"; then
+      echo "Warning: Could not build test template, installing from scratch." | tee -a "$logfile"
+      drop_test_template "$build_db"
+      return 1
+    fi
+    # Publish atomically; a concurrent run may have built the same template meanwhile
+    if run_psql "ALTER DATABASE \"${build_db}\" RENAME TO \"${template}\";" 2>/dev/null; then
+      [ -d "${DATA_DIR}/filestore/${build_db}" ] && mv "${DATA_DIR}/filestore/${build_db}" "${DATA_DIR}/filestore/${template}"
+      run_psql "ALTER DATABASE \"${template}\" WITH IS_TEMPLATE true ALLOW_CONNECTIONS false;"
+    else
+      drop_test_template "$build_db"
+    fi
+  fi
+
+  echo "Cloning test database ${test_db} from ${template}." | tee -a "$logfile"
+  run_psql "CREATE DATABASE \"${test_db}\" TEMPLATE \"${template}\";" || return 1
+  run_psql "COMMENT ON DATABASE \"${template}\" IS '$(date +%s)';"
+  if [ -d "${DATA_DIR}/filestore/${template}" ]; then
+    # Attachments are never modified in place, so hardlinks are a safe copy
+    ${RUNAS} "cp -al '${DATA_DIR}/filestore/${template}' '${DATA_DIR}/filestore/${test_db}'"
+  fi
+
+  # Drop stale templates, keeping the most recently used ones
+  run_psql "SELECT datname FROM pg_database
+            WHERE datname LIKE 'test-template-%' AND datname != '${template}'
+            ORDER BY COALESCE(shobj_description(oid, 'pg_database'), '0') DESC
+            OFFSET GREATEST(${TEST_TEMPLATE_KEEP:-3} - 1, 0);" | while read -r stale; do
+    [ -n "$stale" ] || continue
+    echo "Dropping stale test template ${stale}." | tee -a "$logfile"
+    drop_test_template "$stale"
+  done
+}
+
+# Create an empty test database (or clone the cached template) and apply test-friendly
+# settings to that database only, leaving the server configuration untouched
+create_test_database() {
+  local test_db="$1"
+  local logfile="$2"
+
+  if [ $USE_TEMPLATE -eq 1 ] && [ -n "$TEST_MODULES" ]; then
+    prepare_test_database "$test_db" "${TEST_MODULES#-i }" "$logfile" || USE_TEMPLATE=0
+  fi
+  if [ $USE_TEMPLATE -eq 0 ]; then
+    run_psql "CREATE DATABASE \"${test_db}\" ENCODING 'unicode' LC_COLLATE 'C' TEMPLATE template0;" || return 1
+    # Odoo only initializes an existing empty database when asked to install something
+    [ -z "$TEST_MODULES" ] && TEST_MODULES="-i base"
+  fi
+
+  configure_test_database "$test_db" "$logfile"
+}
+
+# Split the tests of a run into $2 shards of Odoo test tag selectors (one comma-separated
+# line per shard): the test classes of the given custom modules go to $2 - 1 shards,
+# balanced on test method count, and a last shard excludes them all so that every other
+# test (e.g. of the dependency modules) still runs once. Tests inherited from base classes
+# count for every subclass; when a base class cannot be resolved, nothing is printed so the
+# tests run unsharded rather than partially
+shard_test_classes() {
+  ${PYTHON_BIN} - "$1" "$2" <<'PYTHON'
+import ast
+import glob
+import os
+import sys
+
+# Framework bases defining no test methods of their own
+FRAMEWORK_MODULES = ('odoo.tests', 'unittest')
+
+# (module, class name) -> (own test count, [(base name, import source)])
+definitions = {}
+for path in sorted(glob.glob('/custom-odoo/*/tests/*.py')):
+    module = path.split(os.sep)[2]
+    with open(path) as source:
+        tree = ast.parse(source.read(), path)
+    imports = {}
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                imports[alias.asname or alias.name] = '.' * node.level + (node.module or '')
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports[alias.asname or alias.name.split('.')[0]] = alias.name
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            own = sum(isinstance(item, ast.FunctionDef) and item.name.startswith('test')
+                      for item in node.body)
+            bases = []
+            for base in node.bases:
+                root = base
+                while isinstance(root, ast.Attribute):
+                    root = root.value
+                name = base.attr if isinstance(base, ast.Attribute) else getattr(base, 'id', None)
+                bases.append((name, imports.get(getattr(root, 'id', None), '')))
+            definitions[(module, node.name)] = (own, bases)
+
+
+def test_count(module, name, seen=()):
+    """Test methods of a class including inherited ones, or None when a base is unknown."""
+    own, bases = definitions[(module, name)]
+    total = own
+    for base, source in bases:
+        if source.startswith(FRAMEWORK_MODULES) or base == 'object':
+            continue
+        candidates = [key for key in definitions if key[1] == base and key not in seen]
+        key = (module, base) if (module, base) in candidates else (candidates[0] if len(candidates) == 1 else None)
+        inherited = test_count(*key, seen=seen + (key,)) if key else None
+        if inherited is None:
+            return None
+        total += inherited
+    return total
+
+
+classes = []
+for module in filter(None, sys.argv[1].split(',')):
+    for (owner, name) in definitions:
+        if owner != module:
+            continue
+        tests = test_count(module, name, ((module, name),))
+        if tests is None:
+            print(f"Warning: cannot resolve the base classes of {module}:{name}, running unsharded",
+                  file=sys.stderr)
+            sys.exit()
+        if tests:
+            classes.append((tests, f'/{module}:{name}'))
+
+shards = [[0, []] for _ in range(min(int(sys.argv[2]) - 1, len(classes)))]
+for tests, selector in sorted(classes, reverse=True):
+    shard = min(shards, key=lambda shard: shard[0])
+    shard[0] += tests
+    shard[1].append(selector)
+# Only 'standard' tests run when no tag is selected, as in an unsharded run
+for _tests, selectors in shards:
+    print(','.join('standard' + selector for selector in selectors))
+if shards:
+    print(','.join('-' + selector for _tests, selector in classes))
+PYTHON
+}
+
+# Full command running the tests in database $1 on ports $2/$3, restricted to extra test tags $4.
+# Per-test timings are recorded to ${LOG_DIR}/$1.json
+test_command() {
+  local cmd="${PYTHON_BIN} ${TEST_REPORT_SCRIPT} run --results-file=${LOG_DIR}/$1.json \
+    ${ODOO_BIN} ${CMD_BASE} -d $1 --test-enable \
+    --http-port=$2 --gevent-port=$3 --max-cron-threads=0 --stop-after-init \
+    ${EXCLUDED_TESTS}${USER_TEST_TAGS}$4 ${TEST_MODULES} ${ARGS[@]}"
+  echo "${RUNAS} \"SUPPRESS_FS_ERR=0 INSTALL_THEME=0 ${cmd}\""
+}
+
+# Compare installed modules against the source tree ("check": prints "<to install>;<to update>")
+# or record the current source hashes of installed modules ("store"). A module's hash covers
+# every file but static/ and tests/, so manifest, data, view and model changes all count.
+module_changes() {
+  ${PYTHON_BIN} - "$1" "$2" "$3" <<'PYTHON'
+import hashlib
+import json
+import os
+import sys
+
+import psycopg2
+
+HASH_KEY = 'entrypoint.module_hashes'
+action, modules, addons = sys.argv[1], [name for name in sys.argv[2].split(',') if name], sys.argv[3].split(',')
+
+
+def module_hash(module):
+    root = next((os.path.join(path, module) for path in addons
+                 if os.path.isfile(os.path.join(path, module, '__manifest__.py'))), None)
+    if not root:
+        return None
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames
+                             if name not in ('static', 'tests', '__pycache__') and not name.startswith('.'))
+        for name in sorted(filenames):
+            if name.endswith('.pyc'):
+                continue
+            path = os.path.join(dirpath, name)
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+try:
+    conn = psycopg2.connect(host='odoo-postgres', port=5432, user=os.environ['DB_USER'],
+                            password=os.environ['DB_PASS'], dbname=os.environ['DB_NAME'])
+except psycopg2.OperationalError:
+    # The database does not exist yet: Odoo creates it and installs everything
+    print(','.join(modules) + ';')
+    sys.exit()
+
+with conn, conn.cursor() as cr:
+    cr.execute("SELECT to_regclass('ir_module_module') IS NOT NULL")
+    if not cr.fetchone()[0]:
+        print(','.join(modules) + ';')
+        sys.exit()
+    cr.execute("SELECT name, state FROM ir_module_module WHERE name = ANY(%s)", [modules])
+    states = dict(cr.fetchall())
+    cr.execute("SELECT value FROM ir_config_parameter WHERE key = %s", [HASH_KEY])
+    row = cr.fetchone()
+    stored = json.loads(row[0]) if row else {}
+
+    if action == 'check':
+        install = [name for name in modules if states.get(name) not in ('installed', 'to upgrade')]
+        update = [name for name in modules if name not in install
+                  and (states[name] == 'to upgrade' or module_hash(name) != stored.get(name))]
+        print(','.join(install) + ';' + ','.join(update))
+    else:
+        stored.update({name: module_hash(name) for name in modules if states.get(name) == 'installed'})
+        cr.execute("""
+            INSERT INTO ir_config_parameter (key, value, create_date, write_date)
+            VALUES (%s, %s, now() AT TIME ZONE 'UTC', now() AT TIME ZONE 'UTC')
+            ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value, write_date = EXCLUDED.write_date
+        """, [HASH_KEY, json.dumps(stored, sort_keys=True)])
+conn.close()
+PYTHON
+}
+
+# CPUs available to the container, honouring a cgroup CPU quota
+container_cpus() {
+  local quota period
+  if read -r quota period 2>/dev/null < /sys/fs/cgroup/cpu.max && [ "$quota" != "max" ]; then
+    echo $(( (quota + period - 1) / period ))
+  else
+    nproc
+  fi
+}
+
+# Memory available to the container in MB, honouring a cgroup memory limit
+container_memory_mb() {
+  local limit
+  limit=$(cat /sys/fs/cgroup/memory.max 2>/dev/null || echo max)
+  if [ "$limit" != "max" ]; then
+    echo $(( limit / 1024 / 1024 ))
+  else
+    awk '/^MemTotal:/ {printf "%d\n", $2 / 1024}' /proc/meminfo
+  fi
+}
+
 ###############################################
 # Reuseable Odoo Base Commands
 ###############################################
 # Odoo-bin user
 RUNAS="su -s /bin/bash odoo -c"
 
+# Test timing recorder and comparison tool
+TEST_REPORT_SCRIPT="/usr/local/bin/odoo-test-report.py"
+
 # Only applies to main Odoo service
 LIMITS="--limit-time-cpu=3600 --limit-time-real=3600 --max-cron-threads=6"
 
@@ -120,10 +475,14 @@ CMD_BASE="-r ${DB_USER} -w ${DB_PASS} --log-level=${LOG_LEVEL} \
 if [ "$1" = "shell" ]; then
   echo "Entering Odoo shell..."
 
-  # Simple check for --exec flag
-  if [ "$2" = "--exec" ] && [ -n "$3" ]; then
+  # Simple check for --exec / --exec-file flag
+  if { [ "$2" = "--exec" ] || [ "$2" = "--exec-file" ]; } && [ -n "$3" ]; then
     # Execute command mode using separate script
-    EXEC_CMD="$3"
+    if [ "$2" = "--exec-file" ]; then
+      EXEC_CMD="$(cat "$3")"
+    else
+      EXEC_CMD="$3"
+    fi
 
     # Remove leading and trailing newlines from the command
     CLEAN_CMD=$(echo "$EXEC_CMD" | sed '/./,$!d' | sed ':a;N;$!ba;s/\n*$//')
@@ -136,9 +495,60 @@ if [ "$1" = "shell" ]; then
     # Export the command as an environment variable to safely escape it
     export ODOO_EXEC_COMMAND="$EXEC_CMD"
 
+    # Extra options for the script, e.g. --databases=a,b --db-pattern='tenant_*' --jobs=4,
+    # shell-quoted so that the inner shell restores them word for word
+    ODOO_EXEC_ARGS=""
+    if [ $# -gt 3 ]; then
+      ODOO_EXEC_ARGS="$(printf '%q ' "${@:4}")"
+    fi
+    export ODOO_EXEC_ARGS
+
     # Run as odoo user: use environment variable for the command
-    FINAL_CMD="${RUNAS} \"python3 '$SHELL_EXEC_SCRIPT' --python-bin='$PYTHON_BIN' --odoo-bin='$ODOO_BIN' --db-user='$DB_USER' --db-pass='$DB_PASS' --db-name='$DB_NAME' --log-level='$LOG_LEVEL' --data-dir='$DATA_DIR' --addons-path='$ADDONS' --modules='$MODULES' --command=\\\"\\\$ODOO_EXEC_COMMAND\\\"\""
+    FINAL_CMD="${RUNAS} \"eval \\\"set -- \\\$ODOO_EXEC_ARGS\\\"; python3 '$SHELL_EXEC_SCRIPT' --python-bin='$PYTHON_BIN' --odoo-bin='$ODOO_BIN' --db-user='$DB_USER' --db-pass='$DB_PASS' --db-name='$DB_NAME' --log-level='$LOG_LEVEL' --data-dir='$DATA_DIR' --addons-path='$ADDONS' --modules='$MODULES' --command=\\\"\\\$ODOO_EXEC_COMMAND\\\" \\\"\\\$@\\\"\""
     exec bash -c "$FINAL_CMD"
+  elif [ "$2" = "--daemon" ]; then
+    # Warm shell daemon: keeps a loaded registry open so '--exec' calls skip startup
+    SHELL_EXEC_SCRIPT="/usr/local/bin/odoo-shell-exec.py"
+    SOCKET="/tmp/odoo-shell-${DB_NAME}.sock"
+    DAEMON_LOG="${LOG_DIR}/shell-daemon-${DB_NAME}.log"
+
+    case "${3:-start}" in
+      start)
+        if [ -f "${SOCKET}.pid" ] && kill -0 "$(cat "${SOCKET}.pid")" 2>/dev/null; then
+          echo "Shell daemon already running (PID: $(cat "${SOCKET}.pid"))."
+          exit 0
+        fi
+        CMD="${PYTHON_BIN} '$SHELL_EXEC_SCRIPT' --daemon --python-bin='$PYTHON_BIN' --odoo-bin='$ODOO_BIN' --db-user='$DB_USER' --db-pass='$DB_PASS' --db-name='$DB_NAME' --log-level='$LOG_LEVEL' --data-dir='$DATA_DIR' --addons-path='$ADDONS' --socket='$SOCKET'"
+        nohup ${RUNAS} "${CMD}" >> "$DAEMON_LOG" 2>&1 &
+        printf "%s\nShell daemon starting for '%s' (log: %s)\n%s\n" "$SEP" "$DB_NAME" "$DAEMON_LOG" "$SEP"
+        # Wait until the registry is loaded and the socket is ready
+        for _ in $(seq 1 120); do
+          [ -S "$SOCKET" ] && echo "Shell daemon ready on ${SOCKET}." && exit 0
+          sleep 1
+        done
+        echo "Error: shell daemon did not start, see ${DAEMON_LOG}" >&2
+        exit 1
+        ;;
+      stop)
+        if [ -f "${SOCKET}.pid" ]; then
+          kill -SIGTERM "$(cat "${SOCKET}.pid")" 2>/dev/null && echo "Shell daemon stopped."
+        else
+          echo "No shell daemon running."
+        fi
+        ;;
+      status)
+        if [ -S "$SOCKET" ] && [ -f "${SOCKET}.pid" ] && kill -0 "$(cat "${SOCKET}.pid")" 2>/dev/null; then
+          echo "Shell daemon running (PID: $(cat "${SOCKET}.pid")) on ${SOCKET}."
+        else
+          echo "No shell daemon running."
+        fi
+        ;;
+      *)
+        echo "Error: unknown shell daemon action '$3' (use start, stop or status)" >&2
+        exit 1
+        ;;
+    esac
+    exit 0
   else
     # Interactive shell mode: shift past 'shell' and use remaining args
     shift
@@ -161,13 +571,6 @@ elif [ "$1" = "test" ] || [ "$1" = "tests" ]; then
   TEST_DB="testing-$(tr -dc A-Za-z0-9 </dev/urandom | head -c 6)"
   LOGFILE="${LOG_DIR}/${TEST_DB}.log"
 
-  # Set test-friendly PostgreSQL settings
-  echo "Configuring PostgreSQL for testing..." | tee -a "$LOGFILE"
-  PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -c "ALTER SYSTEM SET lock_timeout = 0;" || echo "Warning: Could not set lock_timeout" | tee -a "$LOGFILE"
-  PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -c "ALTER SYSTEM SET statement_timeout = 0;" || echo "Warning: Could not set statement_timeout" | tee -a "$LOGFILE"
-  PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -c "ALTER SYSTEM SET idle_in_transaction_session_timeout = 1800000;" || echo "Warning: Could not set idle_in_transaction_session_timeout" | tee -a "$LOGFILE"
-  PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -c "SELECT pg_reload_conf();" || echo "Warning: Could not reload PostgreSQL configuration" | tee -a "$LOGFILE"
-
   echo "Starting Odoo tests..." | tee -a "$LOGFILE"
 
   # If no arguments or '--install-all' is provided, auto-install all modules from /custom-odoo;
@@ -187,24 +590,284 @@ elif [ "$1" = "test" ] || [ "$1" = "tests" ]; then
     TEST_MODULES="${MODULES}"
   fi
 
-  # Build the testing command
-  CMD="${PYTHON_BIN} ${ODOO_BIN} ${CMD_BASE} -d ${TEST_DB} --test-enable \
-    --http-port=${PORT} --gevent-port=${GEVENT_PORT} --max-cron-threads=0 --stop-after-init \
-    ${EXCLUDED_TESTS}${USER_TEST_TAGS} ${TEST_MODULES} ${ARGS[@]}"
-  FINAL_CMD="${RUNAS} \"SUPPRESS_FS_ERR=0 INSTALL_THEME=0 ${CMD}\""
+  # Sharded mode: split the test classes across several databases and Odoo processes
+  SHARDS=()
+  if [ "$TEST_JOBS" -gt 1 ] 2>/dev/null; then
+    if [[ ",${USER_TEST_TAGS#,}" =~ ,[^-] ]]; then
+      echo "Warning: --jobs ignored because --test-tags selects tests explicitly." | tee -a "$LOGFILE"
+    else
+      mapfile -t SHARDS < <(shard_test_classes "${TEST_MODULES#-i }" "$TEST_JOBS")
+    fi
+  fi
+
+  if [ ${#SHARDS[@]} -le 1 ]; then
+    trap "cleanup_tests '$TEST_DB' '$LOGFILE'" EXIT
+
+    # Start from a cached database holding the dependencies of the tested modules,
+    # so only the tested modules themselves are installed
+    create_test_database "$TEST_DB" "$LOGFILE"
+
+    # Build the testing command
+    FINAL_CMD=$(test_command "$TEST_DB" "$PORT" "$GEVENT_PORT")
+
+    printf "%s\nCommand: %s\n%s\n" "$SEP" "$(echo "${FINAL_CMD}" | sed -e 's/[[:space:]]\+/ /g')" "$SEP" | tee -a "$LOGFILE"
+
+    # Log results of the test (using unbuffer for colored tty output)
+    unbuffer bash -c "${FINAL_CMD}" 2>&1 | tee >(ansifilter -r -a >> "$LOGFILE")
+
+    if [ $? -eq 0 ]; then
+      echo "Test completed successfully." | tee -a "$LOGFILE"
+    else
+      echo "Test encountered errors." | tee -a "$LOGFILE"
+    fi
+    echo "Test timings: ${LOG_DIR}/${TEST_DB}.json (compare with: odoo test-compare)" | tee -a "$LOGFILE"
+    exit 0
+  fi
+
+  # One database, port pair and log per shard; the template is built once, then cloned
+  JOB_PIDS=()
+  CLEANUP=""
+  for i in "${!SHARDS[@]}"; do
+    JOB_DB="${TEST_DB}-$((i + 1))"
+    CLEANUP+="cleanup_tests '$JOB_DB' '$LOGFILE'; "
+    trap "$CLEANUP" EXIT
+    create_test_database "$JOB_DB" "$LOGFILE"
+    [ $i -gt 0 ] && allocate_ports
+    FINAL_CMD=$(test_command "$JOB_DB" "$PORT" "$GEVENT_PORT" ",${SHARDS[$i]}")
+    printf "%s\n[job %s] Command: %s\n%s\n" "$SEP" "$((i + 1))" "$(echo "${FINAL_CMD}" | sed -e 's/[[:space:]]\+/ /g')" "$SEP" | tee -a "$LOGFILE"
+    (
+      set -o pipefail
+      SECONDS=0
+      # set -e is inherited: capture the status so the status file is always written
+      STATUS=0
+      unbuffer bash -c "${FINAL_CMD}" 2>&1 | tee >(ansifilter -r -a > "${LOG_DIR}/${JOB_DB}.log") \
+        | sed -u "s/^/[job $((i + 1))] /" || STATUS=$?
+      echo "${STATUS} ${SECONDS}" > "${LOG_DIR}/${JOB_DB}.status"
+      exit $STATUS
+    ) &
+    JOB_PIDS+=($!)
+  done
 
-  printf "%s\nCommand: %s\n%s\n" "$SEP" "$(echo "${FINAL_CMD}" | sed -e 's/[[:space:]]\+/ /g')" "$SEP" | tee -a "$LOGFILE"
+  FAILED=0
+  for pid in "${JOB_PIDS[@]}"; do
+    wait "$pid" || FAILED=1
+  done
 
-  trap "cleanup_tests '$TEST_DB' '$LOGFILE'" EXIT
+  # Merge the job logs into the run log, followed by a summary of every job
+  SUMMARY="$(printf "%s\nTest summary (%s jobs)\n%s" "$SEP" "${#SHARDS[@]}" "$SEP")"
+  for i in "${!SHARDS[@]}"; do
+    JOB_DB="${TEST_DB}-$((i + 1))"
+    { printf "%s\n[job %s] %s\n%s\n" "$SEP" "$((i + 1))" "${SHARDS[$i]}" "$SEP"; cat "${LOG_DIR}/${JOB_DB}.log"; } >> "$LOGFILE"
+    read -r STATUS DURATION < "${LOG_DIR}/${JOB_DB}.status" || STATUS=1
+    RESULT=$(grep -oE '[0-9]+ failed, [0-9]+ error\(s\) of [0-9]+ tests' "${LOG_DIR}/${JOB_DB}.log" | tail -n 1)
+    SUMMARY+="$(printf "\n[job %s] %-6s %5ss  %s" "$((i + 1))" "$([ "$STATUS" = 0 ] && echo ok || echo FAILED)" "$DURATION" "${RESULT:-no test results}")"
+    rm -f "${LOG_DIR}/${JOB_DB}.log" "${LOG_DIR}/${JOB_DB}.status"
+  done
+  echo "$SUMMARY" | tee -a "$LOGFILE"
 
-  # Log results of the test (using unbuffer for colored tty output)
-  unbuffer bash -c "${FINAL_CMD}" 2>&1 | tee >(ansifilter -r -a >> "$LOGFILE")
+  JOB_RESULTS=()
+  for i in "${!SHARDS[@]}"; do
+    JOB_RESULTS+=("${LOG_DIR}/${TEST_DB}-$((i + 1)).json")
+  done
+  ${PYTHON_BIN} "$TEST_REPORT_SCRIPT" merge "${LOG_DIR}/${TEST_DB}.json" "${JOB_RESULTS[@]}" \
+    && rm -f "${JOB_RESULTS[@]}"
 
-  if [ $? -eq 0 ]; then
+  if [ $FAILED -eq 0 ]; then
     echo "Test completed successfully." | tee -a "$LOGFILE"
   else
     echo "Test encountered errors." | tee -a "$LOGFILE"
   fi
+  echo "Test timings: ${LOG_DIR}/${TEST_DB}.json (compare with: odoo test-compare)" | tee -a "$LOGFILE"
+  exit 0
+
+###############################################
+# Compare Test Timings
+###############################################
+elif [ "$1" = "test-compare" ]; then
+  shift  # Remove 'test-compare' from the arguments
+
+  # Compare the given result file, or the one of the latest test run
+  if [ -n "$1" ] && [ "${1#-}" = "$1" ]; then
+    RESULT="$1"
+    shift
+  else
+    RESULT=$(ls -t "${LOG_DIR}"/testing-??????.json 2>/dev/null | head -n 1)
+  fi
+  if [ -z "$RESULT" ] || [ ! -f "$RESULT" ]; then
+    echo "Error: no test result file found, run 'odoo test' first" >&2
+    exit 1
+  fi
+
+  exec ${PYTHON_BIN} "$TEST_REPORT_SCRIPT" compare "$RESULT" \
+    --baseline="${TEST_BASELINE:-${LOG_DIR}/test-baseline.json}" "$@"
+
+###############################################
+# Query Statistics (pg_stat_statements)
+###############################################
+elif [ "$1" = "dbstats" ]; then
+  shift  # Remove 'dbstats' from the arguments
+
+  TOP=20
+  SORT=""
+  RESET=0
+  STATS_DB="$DB_NAME"
+  while [[ $# -gt 0 ]]; do
+    case "$1" in
+      --top=*) TOP="${1#*=}" ;;
+      --sort=*) SORT="${1#*=}" ;;
+      --reset) RESET=1 ;;
+      --all-databases) STATS_DB="" ;;
+      -d=*|--database=*) STATS_DB="${1#*=}" ;;
+      *) echo "Error: unknown dbstats option '$1'" >&2; exit 1 ;;
+    esac
+    shift
+  done
+
+  run_psql "CREATE EXTENSION IF NOT EXISTS pg_stat_statements;" >/dev/null || {
+    echo "Error: pg_stat_statements is not available; restart odoo-postgres to load it" >&2
+    exit 1
+  }
+
+  if [ -n "$STATS_DB" ]; then
+    DB_FILTER="WHERE d.datname = '${STATS_DB}'"
+  else
+    DB_FILTER=""
+  fi
+  for order in ${SORT:-total calls rows}; do
+    case "$order" in
+      total) ORDER_BY="total_exec_time" ;;
+      mean) ORDER_BY="mean_exec_time" ;;
+      calls) ORDER_BY="calls" ;;
+      rows) ORDER_BY="rows" ;;
+      *) echo "Error: unknown sort '$order' (use total, mean, calls or rows)" >&2; exit 1 ;;
+    esac
+    printf "%s\nTop %s queries by %s%s\n%s\n" "$SEP" "$TOP" "$order" "${STATS_DB:+ in ${STATS_DB}}" "$SEP"
+    PGPASSWORD=${DB_PASS} psql -h odoo-postgres -U ${DB_USER} -d postgres -q -P pager=off -c "
+      SELECT round(s.total_exec_time::numeric, 1) AS total_ms,
+             round((100 * s.total_exec_time / NULLIF(sum(s.total_exec_time) OVER (), 0))::numeric, 1) AS pct,
+             s.calls,
+             round(s.mean_exec_time::numeric, 2) AS mean_ms,
+             s.rows,
+             round((100.0 * s.shared_blks_hit / NULLIF(s.shared_blks_hit + s.shared_blks_read, 0))::numeric, 1) AS hit_pct,
+             left(regexp_replace(s.query, '\s+', ' ', 'g'), $(( COLS > 120 ? COLS - 70 : 50 ))) AS query
+        FROM pg_stat_statements s
+        JOIN pg_database d ON d.oid = s.dbid
+        ${DB_FILTER}
+       ORDER BY s.${ORDER_BY} DESC
+       LIMIT ${TOP};"
+  done
+
+  if [ $RESET -eq 1 ]; then
+    run_psql "SELECT pg_stat_statements_reset();" >/dev/null && echo "Query statistics reset."
+  fi
+  exit 0
+
+###############################################
+# Database and Filestore Snapshots
+###############################################
+elif [ "$1" = "snapshot" ] || [ "$1" = "restore" ]; then
+  ACTION="$1"
+  shift  # Remove 'snapshot' or 'restore' from the arguments
+
+  SNAPSHOT_DIR="${DATA_DIR}/snapshots"
+  SNAPSHOT_DB="$DB_NAME"
+  SNAPSHOT_JOBS=$(container_cpus)
+  NEUTRALIZE=0
+  SNAPSHOT_NAME=""
+  while [[ $# -gt 0 ]]; do
+    case "$1" in
+      --db=*|-d=*) SNAPSHOT_DB="${1#*=}" ;;
+      --jobs=*) SNAPSHOT_JOBS="${1#*=}" ;;
+      --neutralize) NEUTRALIZE=1 ;;
+      --list)
+        ls -1t "$SNAPSHOT_DIR" 2>/dev/null | while read -r name; do
+          printf "%-40s %s\n" "$name" "$(cat "${SNAPSHOT_DIR}/${name}/info" 2>/dev/null)"
+        done
+        exit 0
+        ;;
+      --delete=*)
+        check_snapshot_name "${1#*=}"
+        rm -rf "${SNAPSHOT_DIR:?}/${1#*=}" && echo "Snapshot ${1#*=} deleted."
+        exit 0
+        ;;
+      -*) echo "Error: unknown ${ACTION} option '$1'" >&2; exit 1 ;;
+      *) SNAPSHOT_NAME="$1" ;;
+    esac
+    shift
+  done
+  export PGPASSWORD=${DB_PASS}
+
+  if [ "$ACTION" = "snapshot" ]; then
+    SNAPSHOT_NAME="${SNAPSHOT_NAME:-${SNAPSHOT_DB}-$(date +%Y%m%d-%H%M%S)}"
+    check_snapshot_name "$SNAPSHOT_NAME"
+    TARGET="${SNAPSHOT_DIR}/${SNAPSHOT_NAME}"
+    if [ -e "$TARGET" ]; then
+      echo "Error: snapshot ${SNAPSHOT_NAME} already exists" >&2
+      exit 1
+    fi
+    printf "%s\nSnapshot of %s to %s (%s jobs)\n%s\n" "$SEP" "$SNAPSHOT_DB" "$TARGET" "$SNAPSHOT_JOBS" "$SEP"
+    mkdir -p "$TARGET"
+    trap '[ -f "${TARGET}/info" ] || rm -rf "${TARGET}"' EXIT
+
+    SECONDS=0
+    pg_dump -h odoo-postgres -U ${DB_USER} -Fd -j "$SNAPSHOT_JOBS" -f "${TARGET}/dump" "$SNAPSHOT_DB"
+    echo "Database dumped in ${SECONDS}s."
+
+    # Reflinks (copy-on-write) where the filesystem supports them, hardlinks otherwise:
+    # Odoo never rewrites an attachment file in place, so neither doubles disk usage
+    SECONDS=0
+    if [ -d "${DATA_DIR}/filestore/${SNAPSHOT_DB}" ]; then
+      cp -a --reflink=always "${DATA_DIR}/filestore/${SNAPSHOT_DB}" "${TARGET}/filestore" 2>/dev/null || {
+        rm -rf "${TARGET}/filestore"
+        cp -al "${DATA_DIR}/filestore/${SNAPSHOT_DB}" "${TARGET}/filestore"
+      }
+      echo "Filestore copied in ${SECONDS}s."
+    fi
+
+    echo "${SNAPSHOT_DB}, $(date '+%F %T'), $(du -sh "${TARGET}/dump" | cut -f1) dump" > "${TARGET}/info"
+    echo "Snapshot ${SNAPSHOT_NAME} created."
+    exit 0
+  fi
+
+  # Restore: load the dump into a scratch database, then swap it in place of the target
+  if [ -n "$SNAPSHOT_NAME" ]; then
+    check_snapshot_name "$SNAPSHOT_NAME"
+  fi
+  SOURCE="${SNAPSHOT_DIR}/${SNAPSHOT_NAME}"
+  if [ -z "$SNAPSHOT_NAME" ] || [ ! -d "${SOURCE}/dump" ]; then
+    echo "Error: unknown snapshot '${SNAPSHOT_NAME}' (see 'odoo snapshot --list')" >&2
+    exit 1
+  fi
+  RESTORE_DB="${SNAPSHOT_DB}-restore-$$"
+  printf "%s\nRestoring %s into %s (%s jobs)\n%s\n" "$SEP" "$SNAPSHOT_NAME" "$SNAPSHOT_DB" "$SNAPSHOT_JOBS" "$SEP"
+  trap "run_psql 'DROP DATABASE IF EXISTS \"${RESTORE_DB}\";' >/dev/null 2>&1" EXIT
+
+  SECONDS=0
+  run_psql "CREATE DATABASE \"${RESTORE_DB}\" ENCODING 'unicode' LC_COLLATE 'C' TEMPLATE template0;"
+  pg_restore -h odoo-postgres -U ${DB_USER} -j "$SNAPSHOT_JOBS" --no-owner -d "$RESTORE_DB" "${SOURCE}/dump"
+  run_psql "DROP DATABASE IF EXISTS \"${SNAPSHOT_DB}\" WITH (FORCE);"
+  run_psql "ALTER DATABASE \"${RESTORE_DB}\" RENAME TO \"${SNAPSHOT_DB}\";"
+  echo "Database restored in ${SECONDS}s."
+
+  SECONDS=0
+  rm -rf "${DATA_DIR}/filestore/${SNAPSHOT_DB}"
+  if [ -d "${SOURCE}/filestore" ]; then
+    mkdir -p "${DATA_DIR}/filestore"
+    cp -a --reflink=always "${SOURCE}/filestore" "${DATA_DIR}/filestore/${SNAPSHOT_DB}" 2>/dev/null || {
+      rm -rf "${DATA_DIR}/filestore/${SNAPSHOT_DB}"
+      cp -al "${SOURCE}/filestore" "${DATA_DIR}/filestore/${SNAPSHOT_DB}"
+    }
+    chown -R odoo:odoo "${DATA_DIR}/filestore/${SNAPSHOT_DB}"
+    echo "Filestore restored in ${SECONDS}s."
+  fi
+
+  if [ $NEUTRALIZE -eq 1 ]; then
+    CMD="${PYTHON_BIN} ${ODOO_BIN} neutralize ${CMD_BASE} -d ${SNAPSHOT_DB}"
+    FINAL_CMD="${RUNAS} \"${CMD}\""
+    printf "%s\nCommand: %s\n%s\n" "$SEP" "$(echo "${FINAL_CMD}" | sed -e 's/[[:space:]]\+/ /g')" "$SEP"
+    bash -c "${FINAL_CMD}"
+  fi
+  echo "Snapshot ${SNAPSHOT_NAME} restored into ${SNAPSHOT_DB}."
   exit 0
 
 ###############################################
@@ -274,10 +937,10 @@ elif [ "$1" = "-u" ] || [ "$1" = "-i" ]; then
 # Start or Restart Odoo Normally
 ###############################################
 elif [ "$1" = "restart" ] || [ "$#" -eq 0 ]; then
-  CMD="${PYTHON_BIN} -m debugpy --listen 0.0.0.0:5678 ${ODOO_BIN} ${CMD_BASE} ${LIMITS} -d ${DB_NAME} ${SMTP_SETTINGS} ${MODULES} ${@:2}"
-  FINAL_CMD="${RUNAS} \"${CMD}\""
   PID_FILE="/tmp/odoo.pid"
 
+  # Stop the running server first: the fast boot step below must not upgrade modules
+  # while a live registry holds their locks
   if [ "$1" = "restart" ]; then
     if [ -f "$PID_FILE" ]; then
       OLD_PID=$(cat "$PID_FILE")
@@ -293,6 +956,54 @@ elif [ "$1" = "restart" ] || [ "$#" -eq 0 ]; then
     fi
   fi
 
+  # Fast boot: only install new modules and update changed ones, in a separate step, so an
+  # unchanged restart starts serving without going through the module install machinery
+  if [ "${FAST_BOOT:-1}" != "0" ] && [ -n "$MODULE_LIST" ]; then
+    MODULE_STATE=$(module_changes check "$MODULE_LIST" "$ADDONS") || MODULE_STATE="${MODULE_LIST};"
+    INSTALL_LIST="${MODULE_STATE%%;*}"
+    UPDATE_LIST="${MODULE_STATE#*;}"
+    if [ -z "$INSTALL_LIST" ] && [ -z "$UPDATE_LIST" ]; then
+      echo "Fast boot: modules unchanged since last start."
+      MODULES=""
+    else
+      echo "Fast boot: installing [${INSTALL_LIST}], updating [${UPDATE_LIST}]..."
+      CMD="${PYTHON_BIN} ${ODOO_BIN} ${CMD_BASE} -d ${DB_NAME} --stop-after-init \
+        ${INSTALL_LIST:+-i ${INSTALL_LIST}} ${UPDATE_LIST:+-u ${UPDATE_LIST}}"
+      if bash -c "${RUNAS} \"${CMD}\"" && module_changes store "$MODULE_LIST" "$ADDONS"; then
+        MODULES=""
+      else
+        echo "Warning: Fast boot module update failed, starting with ${MODULES}."
+      fi
+    fi
+  fi
+
+  if [ "${RUN_PROFILE:-development}" = "production" ]; then
+    # Prefork workers sized from the container (2 per CPU + 1), capped so that every worker,
+    # the gevent worker and the cron worker get at least 512MB of 80% of the memory
+    MEMORY_MB=$(container_memory_mb)
+    WORKERS=$(( $(container_cpus) * 2 + 1 ))
+    MAX_WORKERS=$(( MEMORY_MB * 8 / 10 / 512 - 2 ))
+    [ $MAX_WORKERS -lt 1 ] && MAX_WORKERS=1
+    [ $WORKERS -gt $MAX_WORKERS ] && WORKERS=$MAX_WORKERS
+    WORKERS=${ODOO_WORKERS:-$WORKERS}
+
+    # Recycle a worker once it exceeds its share of the memory (at most Odoo's 2GB default)
+    MEMORY_SOFT_MB=$(( MEMORY_MB * 8 / 10 / (WORKERS + 2) ))
+    [ $MEMORY_SOFT_MB -gt 2048 ] && MEMORY_SOFT_MB=2048
+    MEMORY_HARD_MB=$(( MEMORY_SOFT_MB * 5 / 4 ))
+
+    LIMITS="--workers=${WORKERS} --max-cron-threads=1 --gevent-port=8072 \
+      --limit-memory-soft=$(( MEMORY_SOFT_MB * 1024 * 1024 )) --limit-memory-hard=$(( MEMORY_HARD_MB * 1024 * 1024 )) \
+      --limit-time-cpu=60 --limit-time-real=120 --limit-request=8192"
+    echo "Production profile: ${WORKERS} workers, ${MEMORY_SOFT_MB}/${MEMORY_HARD_MB}MB soft/hard memory limit per worker."
+    LAUNCHER="${PYTHON_BIN}"
+  else
+    LAUNCHER="${PYTHON_BIN} -m debugpy --listen 0.0.0.0:5678"
+  fi
+
+  CMD="${LAUNCHER} ${ODOO_BIN} ${CMD_BASE} ${LIMITS} -d ${DB_NAME} ${SMTP_SETTINGS} ${MODULES} ${@:2}"
+  FINAL_CMD="${RUNAS} \"${CMD}\""
+
   echo "Starting Odoo server..."
   printf "%s\nCommand: %s\n%s\n" "$SEP" "$(echo "${FINAL_CMD}" | sed -e 's/[[:space:]]\+/ /g')" "$SEP"
   exec bash -c "${FINAL_CMD}" &
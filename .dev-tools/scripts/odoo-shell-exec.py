@@ -2,13 +2,320 @@
 """
 Odoo Shell Command Executor
 This script executes Python commands in an Odoo shell environment.
+
+With --daemon it instead keeps a loaded registry open and serves commands over a
+Unix socket; later --exec calls for the same database are sent to the daemon
+when one is running, skipping the registry load and IPython startup.
 """
 
 import sys
 import subprocess
 import argparse
+import ast
+import concurrent.futures
+import contextlib
+import datetime
+import fnmatch
+import io
+import json
+import logging
 import os
 import re
+import signal
+import socket
+import threading
+import time
+import traceback
+
+
+# Legacy (IPython) output filtering patterns, compiled once
+ERROR_LINE = re.compile(r'ERROR|Traceback|  File|\w*Error:|\w*Exception:')
+SHELL_READY_LINE = re.compile(r'Python \d+\.\d+\.\d+|IPython.*--|Tip:')
+PROFILING_LINE = re.compile(r'profiling:.*Cannot open')
+INIT_LOG_LINE = re.compile(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \d+ (?:INFO|WARNING)')
+INIT_NOISE_LINE = re.compile(
+    r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \d+ (?:INFO|WARNING)'
+    r'|/.*\.py:\d+: UserWarning:'
+    r'|\s*import pkg_resources'
+    r'|\s*The pkg_resources package'
+    r'|profiling:.*Cannot open'
+)
+COMMAND_START_LINE = re.compile(r'In \[\d+\]:|>>>|env:|odoo:|openerp:|self:')
+
+
+def default_socket_path(db_name):
+    """Socket the shell daemon of the given database listens on."""
+    return f'/tmp/odoo-shell-{db_name}.sock'
+
+
+def execute_in_registry(registry, command, commit=False):
+    """
+    Run a command in its own cursor of an already loaded registry.
+
+    The command sees the same globals as `odoo shell` (env, self, odoo). As in
+    `odoo shell`, its transaction is rolled back unless the command commits it
+    itself; with commit=True it is committed, unless the command raises. As in
+    IPython, the value of a trailing expression is returned.
+
+    :return: A dictionary with returncode, stdout (including log records),
+        return_value (repr), exception (traceback), wall_time, cpu_time and
+        query_count.
+    """
+    import odoo
+
+    output = io.StringIO()
+    handler = logging.StreamHandler(output)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    result = {'returncode': 0, 'return_value': None, 'exception': None, 'query_count': 0}
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    logging.getLogger().addHandler(handler)
+    try:
+        with registry.cursor() as cr, \
+                contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            queries_start = cr.sql_log_count
+            env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+            env = env(context=env['res.users'].context_get())
+            namespace = {'env': env, 'self': env.user, 'odoo': odoo, 'openerp': odoo}
+            try:
+                body, last_expr = split_trailing_expression(command)
+                exec(body, namespace)
+                if last_expr is not None:
+                    value = eval(last_expr, namespace)
+                    if value is not None:
+                        result['return_value'] = repr(value)
+                env.flush_all()
+            except BaseException:
+                result['exception'] = traceback.format_exc()
+                result['returncode'] = 1
+                cr.rollback()
+            else:
+                if not commit:
+                    cr.rollback()
+            result['query_count'] = cr.sql_log_count - queries_start
+    finally:
+        logging.getLogger().removeHandler(handler)
+
+    result['stdout'] = output.getvalue()
+    result['wall_time'] = time.perf_counter() - wall_start
+    result['cpu_time'] = time.process_time() - cpu_start
+    return result
+
+
+def split_trailing_expression(command):
+    """Compile a command, keeping its trailing expression apart so its value can be returned."""
+    tree = ast.parse(command, '<odoo-shell>', 'exec')
+    last_expr = None
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last_expr = compile(ast.Expression(tree.body.pop().value), '<odoo-shell>', 'eval')
+    return compile(tree, '<odoo-shell>', 'exec'), last_expr
+
+
+def format_result(result):
+    """Text rendering of an execution result, as an interactive shell would show it."""
+    text = result['stdout']
+    if result['return_value'] is not None:
+        text += result['return_value'] + '\n'
+    if result['exception']:
+        text += result['exception']
+    return text
+
+
+def bootstrap_registry(args):
+    """Configure Odoo from the command line arguments and load the database registry."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.odoo_bin)))
+    import odoo
+    from odoo.modules.registry import Registry
+
+    odoo.tools.config.parse_config([
+        '-r', args.db_user,
+        '-w', args.db_pass,
+        '--log-level=' + args.log_level,
+        '--db_host=odoo-postgres',
+        '--db_port=5432',
+        '--data-dir=' + args.data_dir,
+        '--addons-path=' + args.addons_path,
+        '-d', args.db_name,
+    ])
+    odoo.netsvc.init_logger()
+    return Registry(args.db_name)
+
+
+def serve_daemon(args):
+    """Load the registry once and run every command received on the socket."""
+    registry = bootstrap_registry(args)
+
+    socket_path = args.socket or default_socket_path(args.db_name)
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen()
+    with open(socket_path + '.pid', 'w') as f:
+        f.write(str(os.getpid()))
+
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"Odoo shell daemon for '{args.db_name}' listening on {socket_path}", flush=True)
+
+    try:
+        while True:
+            conn, _addr = server.accept()
+            with conn:
+                try:
+                    request = json.loads(recv_all(conn))
+                    # Pick up registry changes signaled by other processes (e.g. module upgrades)
+                    registry = registry.check_signaling()
+                    result = execute_in_registry(registry, request['command'], request.get('commit', False))
+                except Exception:
+                    result = {'returncode': 1, 'stdout': '', 'return_value': None,
+                              'exception': traceback.format_exc(),
+                              'wall_time': 0, 'cpu_time': 0, 'query_count': 0}
+                conn.sendall(json.dumps(result).encode())
+                print(f"Command finished in {result['wall_time'] * 1000:.1f} ms, "
+                      f"{result['query_count']} queries (exit {result['returncode']})", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        for path in (socket_path, socket_path + '.pid'):
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+
+
+def recv_all(conn):
+    """Read from a socket until the peer shuts down its writing side."""
+    chunks = []
+    while chunk := conn.recv(65536):
+        chunks.append(chunk)
+    return b''.join(chunks).decode()
+
+
+def run_in_daemon(socket_path, command, commit=False):
+    """
+    Send a command to a running shell daemon.
+
+    Returns the daemon's result dictionary, or None when no daemon is listening.
+    """
+    if not os.path.exists(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return None
+    with client:
+        client.sendall(json.dumps({'command': command, 'commit': commit}).encode())
+        client.shutdown(socket.SHUT_WR)
+        return json.loads(recv_all(client))
+
+
+def script_args(args, db_name, command, *extra):
+    """Arguments re-running this script for a single database and command."""
+    cmd = [
+        os.path.abspath(__file__),
+        '--python-bin=' + args.python_bin,
+        '--odoo-bin=' + args.odoo_bin,
+        '--db-user=' + args.db_user,
+        '--db-pass=' + args.db_pass,
+        '--db-name=' + db_name,
+        '--log-level=' + args.log_level,
+        '--data-dir=' + args.data_dir,
+        '--addons-path=' + args.addons_path,
+        '--modules=' + args.modules,
+        '--command=' + command,
+    ]
+    for flag in ('verbose', 'no_daemon', 'commit', 'json'):
+        if getattr(args, flag):
+            cmd.append('--' + flag.replace('_', '-'))
+    return cmd + list(extra)
+
+
+def list_databases(args, pattern):
+    """Return the databases of the server whose name matches the given glob pattern."""
+    env = dict(os.environ, PGPASSWORD=args.db_pass)
+    out = subprocess.run(
+        ['psql', '-h', 'odoo-postgres', '-U', args.db_user, '-d', 'postgres', '-Atc',
+         "SELECT datname FROM pg_database WHERE NOT datistemplate AND datallowconn ORDER BY datname"],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return [db for db in out.split() if fnmatch.fnmatch(db, pattern)]
+
+
+def run_multi(args, command):
+    """
+    Run the same command against several databases in a bounded process pool.
+
+    Each database runs in its own child process of this script. Output lines are
+    printed as they arrive, prefixed with the database name, and collected into a
+    per-database summary that is also written to a JSON result file.
+    """
+    databases = [db.strip() for db in (args.databases or '').split(',') if db.strip()]
+    if args.db_pattern:
+        databases += [db for db in list_databases(args, args.db_pattern) if db not in databases]
+    if not databases:
+        print("Error: No database matches --databases/--db-pattern", file=sys.stderr)
+        sys.exit(1)
+
+    print_lock = threading.Lock()
+    width = max(len(db) for db in databases)
+
+    def run_one(db):
+        child_cmd = [sys.executable] + script_args(args, db, command)
+
+        start = time.perf_counter()
+        lines = []
+        proc = subprocess.Popen(child_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                text=True, bufsize=1)
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            lines.append(line)
+            with print_lock:
+                print(f"[{db:<{width}}] {line}", flush=True)
+        returncode = proc.wait()
+        return {
+            'database': db,
+            'returncode': returncode,
+            'status': 'ok' if returncode == 0 else 'failed',
+            'duration': round(time.perf_counter() - start, 3),
+            'output': lines,
+        }
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(run_one, databases))
+
+    # Per-database summary
+    width = max(width, len('Database'))
+    print('-' * 50)
+    print(f"{'Database':<{width}}  {'Status':<7} {'Duration':>9}")
+    for result in results:
+        print(f"{result['database']:<{width}}  {result['status']:<7} {result['duration']:>8.1f}s")
+    failed = [r for r in results if r['returncode'] != 0]
+    print(f"{len(results) - len(failed)}/{len(results)} databases succeeded")
+
+    result_file = args.result_file or os.path.join(
+        os.getenv('LOG_DIR', '/tmp'),
+        f"shell-exec-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(result_file, 'w') as f:
+        json.dump({'command': command, 'results': results}, f, indent=2)
+    print(f"Results written to {result_file}")
+
+    sys.exit(1 if failed else 0)
+
+
+def run_direct(args, command):
+    """Run a command in-process without IPython and print its result (as JSON with --json)."""
+    registry = bootstrap_registry(args)
+    result = execute_in_registry(registry, command, commit=args.commit)
+    if args.json:
+        print(json.dumps(result), flush=True)
+    else:
+        print(format_result(result), end='', flush=True)
+    sys.exit(result['returncode'])
 
 
 def main():
@@ -22,11 +329,40 @@ def main():
     parser.add_argument('--data-dir', required=True, help='Data directory')
     parser.add_argument('--addons-path', required=True, help='Addons path')
     parser.add_argument('--modules', default='', help='Modules to install')
-    parser.add_argument('--command', required=True, help='Command to execute')
+    parser.add_argument('--command', help='Command to execute')
     parser.add_argument('--verbose', action='store_true', help='Show all output including initialization')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep a loaded registry open and serve commands over a Unix socket')
+    parser.add_argument('--socket', help='Shell daemon socket (defaults to /tmp/odoo-shell-<db>.sock)')
+    parser.add_argument('--no-daemon', action='store_true', help='Always start a fresh Odoo shell')
+    transaction = parser.add_mutually_exclusive_group()
+    transaction.add_argument('--commit', action='store_true',
+                             help='Commit the transaction when the command succeeds')
+    transaction.add_argument('--rollback', action='store_true',
+                             help='Roll back the transaction, as odoo shell does (default)')
+    parser.add_argument('--json', action='store_true',
+                        help='Run without IPython and print a JSON result (stdout, return value, '
+                             'exception, wall/CPU time, SQL query count)')
+    parser.add_argument('--in-process', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--script-file', help='Execute the content of this file instead of --command')
+    parser.add_argument('--databases', help='Comma-separated databases to run the command against in parallel')
+    parser.add_argument('--db-pattern', help='Glob pattern of databases to run the command against in parallel')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Maximum number of databases processed at once (default: CPU count)')
+    parser.add_argument('--result-file', help='JSON result file of a multi-database run '
+                                              '(defaults to $LOG_DIR/shell-exec-<timestamp>.json)')
 
     args = parser.parse_args()
 
+    if args.daemon:
+        serve_daemon(args)
+        return
+    if args.script_file:
+        with open(args.script_file) as f:
+            args.command = f.read()
+    if not args.command:
+        parser.error('--command or --script-file is required unless --daemon is given')
+
     # Get command from args, or fall back to environment variable
     command = args.command
     if command == "$ODOO_EXEC_COMMAND":
@@ -35,6 +371,35 @@ def main():
             print("Error: No command provided via --command or ODOO_EXEC_COMMAND environment variable", file=sys.stderr)
             sys.exit(1)
 
+    # Run against several databases in parallel
+    if args.databases or args.db_pattern:
+        run_multi(args, command)
+
+    # Structured mode, running inside the Odoo virtualenv
+    if args.in_process:
+        run_direct(args, command)
+
+    # Use the warm shell daemon when one is running for this database
+    if not args.no_daemon:
+        result = run_in_daemon(args.socket or default_socket_path(args.db_name), command,
+                               commit=args.commit)
+        if result is not None:
+            if args.json:
+                print(json.dumps(result), flush=True)
+            else:
+                print(format_result(result), end='', flush=True)
+                if args.verbose:
+                    print(f"Executed by shell daemon in {result['wall_time'] * 1000:.1f} ms, "
+                          f"{result['query_count']} queries")
+            sys.exit(result['returncode'])
+
+    # Structured or committing mode without a daemon: re-run this script with Odoo's
+    # interpreter, as IPython would go on to commit after a failing command
+    if args.json or args.commit:
+        direct_cmd = [args.python_bin] + script_args(args, args.db_name, command, '--in-process')
+        # Server logs go to stderr; stdout carries only the result
+        sys.exit(subprocess.run(direct_cmd, stdin=subprocess.DEVNULL).returncode)
+
     # Build the Odoo shell command
     shell_cmd = [
         args.python_bin, args.odoo_bin, 'shell',
@@ -97,39 +462,25 @@ def main():
                 line = line.rstrip('\n')
 
                 # Always show error messages immediately
-                if any(re.match(pattern, line) for pattern in [
-                    r'^ERROR', r'^Traceback', r'^  File', r'^\w*Error:', r'^\w*Exception:'
-                ]):
+                if ERROR_LINE.match(line):
                     print(line)
                     continue
 
                 # Check if we've reached the shell ready area
                 if in_shell_banner:
-                    if any(re.match(pattern, line) for pattern in [
-                        r'^Python \d+\.\d+\.\d+', r'^IPython.*--', r'^Tip:'
-                    ]):
+                    if SHELL_READY_LINE.match(line):
                         in_shell_banner = False
                         print(line)
                         continue
                     # Still in initialization, suppress logs but show important messages
-                    if not any(re.match(pattern, line) for pattern in [
-                        r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \d+ INFO',
-                        r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \d+ WARNING',
-                        r'^/.*\.py:\d+: UserWarning:',
-                        r'^\s*import pkg_resources',
-                        r'^\s*The pkg_resources package',
-                        r'^profiling:/tmp/.*\.gcda:Cannot open',
-                        r'^profiling:.*Cannot open',
-                    ]):
+                    if not INIT_NOISE_LINE.match(line):
                         if line.strip():  # Don't show empty lines during init
                             print(line)
                     continue
 
                 # Check if command execution has started
                 if not command_started:
-                    if any(re.match(pattern, line) for pattern in [
-                        r'^In \[\d+\]:', r'^>>>', r'^env:', r'^odoo:', r'^openerp:', r'^self:'
-                    ]):
+                    if COMMAND_START_LINE.match(line):
                         command_started = True
                         print(line)
                         continue
@@ -137,19 +488,11 @@ def main():
                 # After command execution starts, show ALL output except profiling errors
                 if command_started:
                     # Show everything (including INFO, WARNING, DEBUG, ERROR logs) except profiling errors
-                    if not any(re.match(pattern, line) for pattern in [
-                        r'^profiling:/tmp/.*\.gcda:Cannot open',
-                        r'^profiling:.*Cannot open',
-                    ]):
+                    if not PROFILING_LINE.match(line):
                         print(line, flush=True)
                 else:
                     # Before command starts, suppress initialization logs (INFO/WARNING) but keep errors
-                    if not any(re.match(pattern, line) for pattern in [
-                        r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \d+ INFO',
-                        r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} \d+ WARNING',
-                        r'^profiling:/tmp/.*\.gcda:Cannot open',
-                        r'^profiling:.*Cannot open',
-                    ]):
+                    if not (INIT_LOG_LINE.match(line) or PROFILING_LINE.match(line)):
                         print(line)
 
         # Wait for completion
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Odoo Test Report
+Records per-test timing of an Odoo test run and compares runs against a baseline.
+
+    run      Run odoo-bin with a hook recording the status, duration and SQL query
+             count of every test, plus the module install time, to a JSON file
+    merge    Combine the result files of several test jobs into one
+    compare  Report the slowest tests and the tests that got slower or issue more
+             queries than in a baseline result file
+"""
+
+import os
+
+# Odoo expects the server timezone to be UTC before the time module is imported
+os.environ['TZ'] = 'UTC'
+
+import argparse
+import atexit
+import datetime
+import json
+import runpy
+import shutil
+import sys
+import time
+
+
+def install_hooks(results):
+    """Patch the Odoo test result and module loader to record timings into results."""
+    import odoo
+    from odoo.modules import loading
+    from odoo.tests import result as test_result
+
+    result_class = test_result.OdooTestResult
+    start_test, stop_test = result_class.startTest, result_class.stopTest
+
+    outcome_counters = {'error': 'errors_count', 'failure': 'failures_count', 'skipped': 'skipped'}
+
+    def outcomes(result):
+        return {status: count(getattr(result, counter, 0)) for status, counter in outcome_counters.items()}
+
+    def startTest(self, test):
+        self._report_start = (time.perf_counter(), odoo.sql_db.sql_counter, outcomes(self))
+        return start_test(self, test)
+
+    def stopTest(self, test):
+        res = stop_test(self, test)
+        if getattr(self, '_report_start', None):
+            started, queries, before = self._report_start
+            self._report_start = None
+            after = outcomes(self)
+            status = next((status for status in outcome_counters if after[status] > before[status]), 'success')
+            record_test(results, test.id(), status, time.perf_counter() - started,
+                        odoo.sql_db.sql_counter - queries)
+        return res
+
+    result_class.startTest, result_class.stopTest = startTest, stopTest
+
+    load_modules = loading.load_modules
+
+    def timed_load_modules(*args, **kwargs):
+        # at_install tests run while modules are loaded; they are not install time
+        started, tests_before = time.perf_counter(), len(results['tests'])
+        try:
+            return load_modules(*args, **kwargs)
+        finally:
+            test_time = sum(test['duration'] for test in results['tests'][tests_before:])
+            results['install_time'] += time.perf_counter() - started - test_time
+
+    # Registry.new calls it through the name re-exported by odoo.modules
+    loading.load_modules = odoo.modules.load_modules = timed_load_modules
+
+
+def count(value):
+    """Outcome counters are integers on OdooTestResult but lists on unittest results."""
+    return len(value) if isinstance(value, (list, tuple)) else value
+
+
+def record_test(results, test_id, status, duration, queries):
+    parts = test_id.split('.')
+    module = parts[2] if test_id.startswith('odoo.addons.') and len(parts) > 2 else parts[0]
+    results['tests'].append({
+        'id': test_id,
+        'module': module,
+        'test': '.'.join(parts[-2:]),
+        'status': status,
+        'duration': round(duration, 4),
+        'queries': queries,
+    })
+
+
+def write_results(path, results):
+    results['tests'].sort(key=lambda test: test['id'])
+    results['install_time'] = round(results['install_time'], 3)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def run(args):
+    """Run odoo-bin in this interpreter with the timing hooks installed."""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.odoo_bin)))
+    results = {
+        'started': datetime.datetime.now().isoformat(timespec='seconds'),
+        'command': ' '.join(args.odoo_args),
+        'install_time': 0.0,
+        'tests': [],
+    }
+    install_hooks(results)
+    atexit.register(write_results, args.results_file, results)
+
+    sys.argv = [args.odoo_bin] + args.odoo_args
+    runpy.run_path(args.odoo_bin, run_name='__main__')
+
+
+def merge(args):
+    merged = {'started': None, 'jobs': [], 'install_time': 0.0, 'tests': []}
+    for path in args.inputs:
+        if not os.path.exists(path):
+            print(f"Warning: missing result file {path}", file=sys.stderr)
+            continue
+        results = load_results(path)
+        merged['started'] = min(filter(None, [merged['started'], results['started']]))
+        merged['jobs'].append({'command': results['command'], 'install_time': results['install_time'],
+                               'tests': len(results['tests'])})
+        # Jobs install in parallel, so the run waited for the slowest one
+        merged['install_time'] = max(merged['install_time'], results['install_time'])
+        merged['tests'].extend(results['tests'])
+    write_results(args.output, merged)
+
+
+def compare(args):
+    results = load_results(args.result)
+    tests = results['tests']
+    total = sum(test['duration'] for test in tests)
+    failed = sum(test['status'] in ('failure', 'error') for test in tests)
+
+    print(f"Result: {args.result}")
+    print(f"{len(tests)} tests ({failed} failed) in {total:.2f}s, "
+          f"{sum(test['queries'] for test in tests)} queries; "
+          f"module install {results['install_time']:.2f}s")
+
+    print(f"\nSlowest {min(args.top, len(tests))} tests:")
+    for test in sorted(tests, key=lambda test: test['duration'], reverse=True)[:args.top]:
+        print(f"  {test['duration']:8.2f}s {test['queries']:7d} queries  {test['module']}: {test['test']}")
+
+    regressions = 0
+    if os.path.exists(args.baseline) and os.path.abspath(args.baseline) != os.path.abspath(args.result):
+        baseline = load_results(args.baseline)
+        previous = {test['id']: test for test in baseline['tests']}
+        print(f"\nCompared to baseline {args.baseline} ({baseline['started']}):")
+        for test in sorted(tests, key=lambda test: test['id']):
+            before = previous.get(test['id'])
+            if not before or test['status'] == 'skipped':
+                continue
+            delta = test['duration'] - before['duration']
+            slower = (delta > args.min_delta
+                      and test['duration'] > before['duration'] * (1 + args.threshold / 100))
+            more_queries = test['queries'] > before['queries'] + args.query_threshold
+            if slower or more_queries:
+                regressions += 1
+                print(f"  {test['module']}: {test['test']}  "
+                      f"{before['duration']:.2f}s -> {test['duration']:.2f}s, "
+                      f"{before['queries']} -> {test['queries']} queries")
+        install_delta = results['install_time'] - baseline['install_time']
+        if install_delta > args.min_delta and \
+                results['install_time'] > baseline['install_time'] * (1 + args.threshold / 100):
+            regressions += 1
+            print(f"  module install  {baseline['install_time']:.2f}s -> {results['install_time']:.2f}s")
+        new_tests = set(test['id'] for test in tests) - set(previous)
+        print(f"  {regressions} regression(s), {len(new_tests)} new test(s)")
+    elif not args.save_baseline:
+        print(f"\nNo baseline found at {args.baseline} (use --save-baseline to create it)")
+
+    if args.save_baseline:
+        shutil.copyfile(args.result, args.baseline)
+        print(f"\nSaved {args.result} as baseline {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and compare Odoo test timings')
+    subparsers = parser.add_subparsers(dest='action', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run odoo-bin and record test timings')
+    run_parser.add_argument('--results-file', required=True, help='JSON file to write the results to')
+    run_parser.add_argument('odoo_bin', help='Path to Odoo binary')
+    run_parser.add_argument('odoo_args', nargs=argparse.REMAINDER, help='Arguments for odoo-bin')
+
+    merge_parser = subparsers.add_parser('merge', help='Merge the result files of several jobs')
+    merge_parser.add_argument('output', help='Merged result file')
+    merge_parser.add_argument('inputs', nargs='+', help='Result files of the jobs')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare a result file to a baseline')
+    compare_parser.add_argument('result', help='Result file of a test run')
+    compare_parser.add_argument('--baseline', required=True, help='Baseline result file')
+    compare_parser.add_argument('--save-baseline', action='store_true',
+                                help='Store the result as the new baseline after comparing')
+    compare_parser.add_argument('--top', type=int, default=15, help='Number of slowest tests to show')
+    compare_parser.add_argument('--threshold', type=float, default=25,
+                                help='Percentage a test may get slower before it is reported')
+    compare_parser.add_argument('--min-delta', type=float, default=0.25,
+                                help='Seconds a test may get slower before it is reported')
+    compare_parser.add_argument('--query-threshold', type=int, default=0,
+                                help='Extra queries a test may issue before it is reported')
+
+    args = parser.parse_args()
+    {'run': run, 'merge': merge, 'compare': compare}[args.action](args)
+
+
+if __name__ == '__main__':
+    main()
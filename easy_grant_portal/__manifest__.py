@@ -7,6 +7,8 @@
     Features include:
     - Grant/Revoke portal access buttons in partner views
     - Confirmation modal with revocation reason tracking
+    - Indexed audit log of every grant and revocation
+    - Nightly reconciliation report of portal users drifting from their partners
     - Portal access status indicators
     - Automatic email invitations when granting access
     """,
@@ -15,10 +17,13 @@
     'category': 'Extra Tools',
     'version': '17.0.1.0.0',
     'license': 'LGPL-3',
-    'depends': ['base', 'portal', 'auth_signup'],
+    'depends': ['base', 'bus', 'portal', 'auth_signup'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'views/res_partner.xml',
+        'views/portal_access_log.xml',
+        'views/portal_access_drift.xml',
     ],
     'assets': {
         'web.assets_backend': [
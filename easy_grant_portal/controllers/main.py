@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from odoo import http
+from odoo.http import request
+
+
+class PortalAccessController(http.Controller):
+
+    @http.route('/easy_grant_portal/portal_access', type='json', auth='user')
+    def portal_access_status(self, partner_ids):
+        """
+        Return the portal access status for several partners in a single call.
+
+        The status is computed in batch for the whole recordset, so refreshing every
+        visible kanban card costs one request instead of one view reload.
+
+        :param partner_ids: list of res.partner ids to look up
+        :return: A dictionary mapping partner id to its portal access status.
+        """
+        partners = request.env['res.partner'].browse([int(pid) for pid in partner_ids or []]).exists()
+        return {partner.id: partner.portal_access for partner in partners}
@@ -1,3 +1,6 @@
 # -*- coding: utf-8 -*-
 from . import res_partner
 from . import res_users
+from . import portal_access_log
+from . import portal_access_drift
+from . import ir_websocket
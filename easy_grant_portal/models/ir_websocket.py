@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from odoo import models
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Subscribe internal users to the channel portal access changes are sent on."""
+        channels = super()._build_bus_channel_list(channels)
+        if self.env.user._is_internal():
+            channels = list(channels) + [self.env.ref('base.group_user')]
+        return channels
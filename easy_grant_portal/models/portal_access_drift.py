@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+
+from odoo import api, fields, models, tools
+
+_logger = logging.getLogger(__name__)
+
+RECONCILE_BATCH_SIZE = 1000
+
+"""
+Each check is a single INSERT ... SELECT that writes every offending user/partner pair
+into the report table. Parameters available to the queries:
+    - now: timestamp of the run
+    - portal_gid: id of base.group_portal
+    - template_uid: id of the portal template user, which is expected to look inconsistent
+"""
+DRIFT_QUERIES = {
+    # Active portal user whose partner email no longer matches the login
+    'login_mismatch': """
+        SELECT u.id, p.id, u.login || ' <> ' || COALESCE(p.email, '')
+          FROM res_users u
+          JOIN res_partner p ON p.id = u.partner_id
+          JOIN res_groups_users_rel r ON r.uid = u.id AND r.gid = %(portal_gid)s
+         WHERE u.active
+           AND u.id != %(template_uid)s
+           AND u.login IS DISTINCT FROM p.email
+    """,
+    # Active portal user attached to an archived partner
+    'partner_archived': """
+        SELECT u.id, p.id, u.login
+          FROM res_users u
+          JOIN res_partner p ON p.id = u.partner_id
+          JOIN res_groups_users_rel r ON r.uid = u.id AND r.gid = %(portal_gid)s
+         WHERE u.active
+           AND u.id != %(template_uid)s
+           AND NOT p.active
+    """,
+    # Deactivated user still in the portal group: granting again raises "already has portal access"
+    'revoked_in_portal_group': """
+        SELECT u.id, u.partner_id, u.login
+          FROM res_users u
+          JOIN res_groups_users_rel r ON r.uid = u.id AND r.gid = %(portal_gid)s
+         WHERE NOT u.active
+           AND u.id != %(template_uid)s
+    """,
+    # Deactivated portal user whose login is the email of another partner:
+    # granting from that partner requires the allow_change_partner context
+    'partner_changed': """
+        SELECT u.id, p.id, u.login
+          FROM res_users u
+          JOIN res_partner p ON p.email = u.login AND p.id != u.partner_id
+         WHERE NOT u.active
+           AND u.share
+           AND p.active
+           AND u.id != %(template_uid)s
+    """,
+    # Partner email used as the login of an internal user: granting is refused
+    'internal_login_conflict': """
+        SELECT u.id, p.id, u.login
+          FROM res_users u
+          JOIN res_partner p ON p.email = u.login AND p.id != u.partner_id
+         WHERE NOT u.share
+           AND p.active
+           AND p.is_company IS NOT TRUE
+    """,
+}
+
+# Drift kinds that can be corrected without changing credentials or partner links
+SAFE_FIX_KINDS = ('revoked_in_portal_group',)
+
+
+class PortalAccessDrift(models.Model):
+    """
+    Report of inconsistencies between portal users and their partners.
+
+    The report is rebuilt by the nightly reconciliation job with a handful of
+    set-based queries, so it stays fast on databases with 100k+ partners.
+    """
+    _name = 'portal.access.drift'
+    _description = 'Portal Access Drift'
+    _order = 'kind, id'
+    _rec_name = 'kind'
+    _log_access = False
+
+    date = fields.Datetime(string="Detected On", readonly=True)
+    kind = fields.Selection(
+        [
+            ('login_mismatch', 'Login differs from partner email'),
+            ('partner_archived', 'Portal user on archived partner'),
+            ('revoked_in_portal_group', 'Inactive user still in portal group'),
+            ('partner_changed', 'Inactive user linked to another partner'),
+            ('internal_login_conflict', 'Email used by an internal user'),
+        ],
+        string="Issue",
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    user_id = fields.Many2one('res.users', string="User", readonly=True,
+                              ondelete='cascade', context={'active_test': False})
+    partner_id = fields.Many2one('res.partner', string="Partner", readonly=True,
+                                 ondelete='cascade', context={'active_test': False})
+    detail = fields.Char(string="Detail", readonly=True)
+    fixed = fields.Boolean(string="Fixed", readonly=True)
+
+    @api.model
+    def _cron_reconcile(self):
+        """Nightly entry point: rebuild the report and apply safe fixes if enabled."""
+        apply_fixes = tools.str2bool(self.env['ir.config_parameter'].sudo().get_param(
+            'easy_grant_portal.reconcile_apply_fixes', 'False'))
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        self._reconcile(apply_fixes=apply_fixes, auto_commit=auto_commit)
+
+    def action_reconcile(self):
+        """Rebuild the report on demand from the list view."""
+        self._reconcile()
+        return {'type': 'ir.actions.client', 'tag': 'reload'}
+
+    @api.model
+    def _reconcile(self, apply_fixes=False, auto_commit=False):
+        """
+        Rebuild the drift report and optionally apply safe fixes in batches.
+
+        :param apply_fixes: fix the drift kinds listed in SAFE_FIX_KINDS
+        :param auto_commit: commit after the report and after each fix batch
+        :return: A dictionary with the number of issues found per kind.
+        """
+        start = time.time()
+        cr = self.env.cr
+        template_uid = int(self.env['ir.config_parameter'].sudo().get_param('base.template_portal_user_id', 0) or 0)
+        params = {
+            'now': fields.Datetime.now(),
+            'portal_gid': self.env.ref('base.group_portal').id,
+            'template_uid': template_uid,
+        }
+
+        cr.execute("DELETE FROM portal_access_drift")
+        counts = {}
+        for kind, query in DRIFT_QUERIES.items():
+            cr.execute(f"""
+                INSERT INTO portal_access_drift (date, kind, user_id, partner_id, detail, fixed)
+                SELECT %(now)s, %(kind)s, drift.*, false
+                  FROM ({query}) AS drift
+            """, dict(params, kind=kind))
+            counts[kind] = cr.rowcount
+        self.invalidate_model()
+        _logger.info("Portal access reconciliation found %s in %.2fs", counts, time.time() - start)
+        if auto_commit:
+            cr.commit()
+
+        if apply_fixes:
+            self._apply_safe_fixes(auto_commit=auto_commit)
+        return counts
+
+    @api.model
+    def _apply_safe_fixes(self, auto_commit=False):
+        """Move deactivated users that kept the portal group to the public group, batch by batch."""
+        portal_group = self.env.ref('base.group_portal')
+        public_group = self.env.ref('base.group_public')
+        drifts = self.search([('kind', 'in', SAFE_FIX_KINDS), ('fixed', '=', False)])
+        for batch in tools.split_every(RECONCILE_BATCH_SIZE, drifts.ids, self.browse):
+            users = batch.user_id.with_context(active_test=False)
+            users.sudo().write({'groups_id': [(3, portal_group.id), (4, public_group.id)]})
+            self.env.cr.execute("UPDATE portal_access_drift SET fixed = true WHERE id IN %s", [tuple(batch.ids)])
+            batch.invalidate_recordset(['fixed'])
+            _logger.info("Portal access reconciliation fixed %s users", len(users))
+            if auto_commit:
+                self.env.cr.commit()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+from odoo import _, api, fields, models, tools
+from odoo.exceptions import UserError
+
+
+class PortalAccessLog(models.Model):
+    """
+    Append-only audit trail of portal access changes.
+
+    Each grant or revoke writes one narrow, indexed row instead of posting to the
+    partner's chatter, so toggling many contacts does not fan out follower
+    notifications. Chatter mirroring can be switched back on with the
+    ``easy_grant_portal.chatter_mirror`` system parameter. The partner's and actor's
+    names are stored on each row, so the history outlives their deletion.
+    """
+    _name = 'portal.access.log'
+    _description = 'Portal Access Log'
+    _order = 'date desc, id desc'
+    _rec_name = 'partner_name'
+    _log_access = False
+
+    date = fields.Datetime(
+        string="Date",
+        default=fields.Datetime.now,
+        required=True,
+        readonly=True,
+        index=True,
+    )
+    partner_id = fields.Many2one(
+        'res.partner',
+        string="Partner",
+        readonly=True,
+        index=True,
+        ondelete='set null',
+    )
+    partner_name = fields.Char(string="Partner Name", readonly=True)
+    user_id = fields.Many2one(
+        'res.users',
+        string="Portal User",
+        readonly=True,
+        index='btree_not_null',
+        ondelete='set null',
+        context={'active_test': False},
+    )
+    action = fields.Selection(
+        [('grant', 'Granted'), ('revoke', 'Revoked')],
+        string="Action",
+        required=True,
+        readonly=True,
+    )
+    actor_id = fields.Many2one(
+        'res.users',
+        string="Performed By",
+        readonly=True,
+        index=True,
+        ondelete='set null',
+        default=lambda self: self.env.user,
+    )
+    actor_name = fields.Char(string="Performed By Name", readonly=True)
+    reason = fields.Text(string="Reason", readonly=True)
+
+    def init(self):
+        # Partner history lookups always read the most recent entries first
+        tools.create_index(self._cr, 'portal_access_log_partner_date_index',
+                           self._table, ['partner_id', 'date DESC'])
+
+    @api.model
+    def log_portal_access(self, partner, action, user=None, reason=None):
+        """
+        Record a portal access change and optionally mirror it to the chatter.
+
+        :param partner: the res.partner whose access changed
+        :param action: 'grant' or 'revoke'
+        :param user: the res.users record that was granted or revoked, if known
+        :param reason: the revocation reason, if any
+        :return: the created portal.access.log record
+        """
+        log = self.sudo().create({
+            'partner_id': partner.id,
+            'partner_name': partner.display_name,
+            'user_id': user.id if user else False,
+            'action': action,
+            'actor_id': self.env.user.id,
+            'actor_name': self.env.user.name,
+            'reason': reason or False,
+        })
+        if tools.str2bool(self.env['ir.config_parameter'].sudo().get_param('easy_grant_portal.chatter_mirror', 'False')):
+            log._mirror_to_chatter()
+        return log
+
+    def _mirror_to_chatter(self):
+        """Post each entry as an internal note, which does not notify followers."""
+        for log in self:
+            if log.action == 'grant':
+                message = _("Portal access has been granted by %s.") % log.actor_name
+            else:
+                message = _("Portal access has been revoked by %s. Revocation reason: %s") % (log.actor_name, log.reason)
+            log.partner_id.message_post(body=message, subtype_xmlid='mail.mt_note')
+            if log.partner_id.parent_id:
+                log.partner_id.parent_id.message_post(
+                    body=_("For partner %s: %s") % (log.partner_id.name, message),
+                    subtype_xmlid='mail.mt_note',
+                )
+
+    def write(self, vals):
+        raise UserError(_("Portal access log entries cannot be modified."))
+
+    def unlink(self):
+        raise UserError(_("Portal access log entries cannot be deleted."))
@@ -19,23 +19,42 @@ class ResPartner(models.Model):
     def _compute_portal_access(self):
         """Compute if the partner has portal access based on their user groups."""
         portal_group = self.env.ref('base.group_portal')
+
+        # Look up the deactivated users of the whole batch in a single query
+        emails = [email for email in set(self.mapped('email')) if email]
+        revoked_logins = set()
+        if emails:
+            revoked_logins = set(self.env['res.users'].search([
+                ('login', 'in', emails), ('active', '=', False),
+            ]).mapped('login'))
+
         for partner in self:
             if any(portal_group in user.groups_id for user in partner.user_ids):
                 partner.portal_access = 'active'
-            elif self.env['res.users'].search([('login', '=', partner.email), ('active', 'in', [False])], limit=1):
+            elif partner.email in revoked_logins:
                 partner.portal_access = 'revoked'
             else:
                 partner.portal_access = 'none'
 
+    def _users_by_login(self):
+        """Map the login of the users, active or not, matching the partners' emails."""
+        emails = [email for email in set(self.mapped('email')) if email]
+        if not emails:
+            return {}
+        users = self.env['res.users'].search([('login', 'in', emails), ('active', 'in', [True, False])])
+        return {user.login: user for user in users}
+
     @api.depends('user_ids.portal_revoke_note')
     def _compute_portal_revoke_note(self):
+        users = self._users_by_login()
         for partner in self:
-            user = self.env['res.users'].search([('login', '=', partner.email),('active', 'in', [True, False])], limit=1)
-            partner.portal_revoke_note = user.portal_revoke_note or False
+            user = users.get(partner.email)
+            partner.portal_revoke_note = user and user.portal_revoke_note or False
 
     def _inverse_portal_revoke_note(self):
+        users = self._users_by_login()
         for partner in self:
-            if user := self.env['res.users'].search([('login', '=', partner.email),('active', 'in', [True, False])], limit=1):
+            if user := users.get(partner.email):
                 user.sudo().portal_revoke_note = partner.portal_revoke_note
 
     def toggle_portal_access(self):
@@ -91,15 +110,15 @@ class ResPartner(models.Model):
         # Ensure the state matches the expected result
         success = result.get("success") and (self.portal_access == 'active') == expected_access
 
-        # Log to the chatter
+        # Record the change in the audit log
         if success:
-            if self.portal_access == 'active':
-                message = _("Portal access has been granted by %s.") % self.env.user.name
-            else:
-                message = _("Portal access has been revoked by %s. Revocation reason: %s") % (self.env.user.name, self.portal_revoke_note)
-            self.message_post(body=message)
-            if self.parent_id:
-                self.parent_id.message_post(body=_("For partner %s: %s") % (self.name, message))
+            self.env['portal.access.log'].log_portal_access(
+                self,
+                'grant' if self.portal_access == 'active' else 'revoke',
+                user=self.env['res.users'].sudo().browse(result.get('user_id')),
+                reason=self.portal_revoke_note if self.portal_access != 'active' else None,
+            )
+            self._notify_portal_access_changed()
 
         results = self._prepare_result(
             success=success,
@@ -116,6 +135,13 @@ class ResPartner(models.Model):
             "params": results,
         }
 
+    def _notify_portal_access_changed(self):
+        """Send the changed partner ids to internal users so open kanban views refresh their cards in one RPC."""
+        # Any client may listen on a string channel; only internal users join the group's one
+        self.env['bus.bus']._sendone(self.env.ref('base.group_user'), 'easy_grant_portal/portal_access_changed', {
+            'partner_ids': self.ids,
+        })
+
     def _prepare_result(self, success, portal_access, res_id, message):
         """Helper method to structure the result data."""
         return {
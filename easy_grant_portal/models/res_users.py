@@ -2,11 +2,20 @@
 import logging
 from datetime import timedelta
 
+from psycopg2 import errors
+
 from odoo import _, api, fields, models
 from odoo.exceptions import AccessDenied, UserError
 
 _logger = logging.getLogger(__name__)
 
+# First key of the two-key advisory locks taken on portal emails, so they never
+# collide with advisory locks taken by other modules
+PORTAL_ACCESS_LOCK_NAMESPACE = 0x6567  # 'eg'
+
+# Concurrency errors left to Odoo's retrying() instead of being reported as failures
+RETRYABLE_ERRORS = (errors.SerializationFailure, errors.LockNotAvailable, errors.DeadlockDetected)
+
 
 class ResUsers(models.Model):
     _inherit = 'res.users'
@@ -37,6 +46,9 @@ class ResUsers(models.Model):
             if not partner.email:
                 raise UserError(_("This partner does not have an email address."))
 
+            # Serialize concurrent grants/revokes for the same email
+            self._lock_portal_email(partner.email)
+
             # Check if a user exists by email. There should only ever be one on res_users
             user = self.search([('login', '=', partner.email), ('active', 'in', [True, False])], limit=1)
 
@@ -49,17 +61,23 @@ class ResUsers(models.Model):
 
             # If the user does not exist and needs to be created
             if not user:
-                user = self.env['res.users'].create({
-                    'partner_id': partner.id,
-                    'login': partner.email,
-                    # Remove other groups, add to Portal group
-                    'groups_id': [(5, 0, 0), (4, portal_group.id)],
-                })
+                try:
+                    with self.env.cr.savepoint():
+                        user = self.env['res.users'].create({
+                            'partner_id': partner.id,
+                            'login': partner.email,
+                            # Remove other groups, add to Portal group
+                            'groups_id': [(5, 0, 0), (4, portal_group.id)],
+                        })
+                except errors.UniqueViolation:
+                    # A concurrent grant committed this login after our snapshot was taken
+                    raise UserError(_("Portal access for %s was just granted by another user.") % partner.email)
                 # Send invitation email
                 user._action_reset_password()
                 return {
                     'success': True,
                     'message': f"Portal access granted to email: {partner.email}. Password reset email sent.",
+                    'user_id': user.id,
                 }
 
             # The user exists already, but has been deactivated for some reason
@@ -79,12 +97,15 @@ class ResUsers(models.Model):
                 return {
                     'success': True,
                     'message': f"Portal access reactivated for email: {partner.email}. Password reset email sent.",
+                    'user_id': user.id,
                 }
 
             else:
                 raise UserError(_("An account with the email %s associated with the partner %s already has portal access.") %
                                 (user.login, user.partner_id.name))
 
+        except RETRYABLE_ERRORS:
+            raise
         except Exception as e:
             return {'success': False, 'message': str(e)}
 
@@ -107,6 +128,9 @@ class ResUsers(models.Model):
             if not partner.email:
                 raise UserError(_("No partner found with the id: %s.") % partner_id)
 
+            # Serialize concurrent grants/revokes for the same email
+            self._lock_portal_email(partner.email)
+
             user = self.env['res.users'].search([('login', '=', partner.email)], limit=1)
             if not user:
                 raise UserError(_("No Portal user found with email: %s") % partner.email)
@@ -124,13 +148,31 @@ class ResUsers(models.Model):
             return {
                 'success': True,
                 'message': f"Portal access revoked for email: {partner.email}. User deactivated and moved to public group.",
+                'user_id': user.id,
             }
+        except RETRYABLE_ERRORS:
+            raise
         except Exception as e:
             return {
                 'success': False,
                 'message': str(e),
             }
 
+    def _lock_portal_email(self, email):
+        """
+        Take a transaction-scoped advisory lock on the given email.
+
+        Grants and revokes for the same email wait for each other, while changes for
+        different emails never block one another. A waiter whose snapshot predates the
+        winner's commit either hits the login unique constraint (turned into a UserError
+        by the caller) or a serialization failure, which the callers re-raise so that
+        Odoo's retrying() rolls back and replays the whole call.
+        """
+        self.env.cr.execute(
+            "SELECT pg_advisory_xact_lock(%s, hashtext(lower(%s)))",
+            (PORTAL_ACCESS_LOCK_NAMESPACE, email),
+        )
+
     def _is_inactive_user(self, user):
         """Return True if the user exists but is inactive and not in the portal group."""
         portal_group = self.env.ref('base.group_portal', raise_if_not_found=True)
@@ -4,24 +4,19 @@ import { FormRenderer } from "@web/views/form/form_renderer";
 import { patch } from "@web/core/utils/patch";
 import { onMounted } from "@odoo/owl";
 
-registry.category("actions").add("refresh_portal_access_button", async function (env, { params }) {
-    const { success, portal_access, message, res_id } = params;
-    const notification = env.services.notification;
-    const dialog = env.services.dialog;
-
-    if (!success) {
-        notification.add(`Error: ${message}`, { type: "danger" });
-        return;
-    }
-
-    const button = document.getElementById(`portal_access_button_${res_id}`);
-    if (!button) {
-        console.warn(`Button with ID portal_access_button_${res_id} not found.`);
-        return;
-    }
+const PORTAL_ACCESS_BUTTON_PREFIX = "portal_access_button_";
+// How long the bus notification of this client's own change is waited for
+const OWN_CHANGE_TTL = 10000;
 
+/**
+ * Update a single portal access button to reflect the given access state
+ * @param {HTMLElement} button
+ * @param {string} portal_access
+ * @returns void
+ */
+function updatePortalAccessButton(button, portal_access) {
     // Update button class and text based on the new access state
-    button.classList.remove("btn-primary", "btn-danger");
+    button.classList.remove("btn-primary", "btn-danger", "btn-warning");
     if (portal_access === 'active') {
         button.classList.add("btn-danger");
         button.textContent = "Revoke Portal Access";
@@ -32,10 +27,82 @@ registry.category("actions").add("refresh_portal_access_button", async function
         button.classList.add("btn-warning");
         button.textContent = "Unknown Portal Access Status";
     }
+}
+
+/**
+ * Refresh the status of every visible portal access button with a single RPC
+ * @param {Function} rpc
+ * @param {number[]} [changedIds] only refresh if one of these partners is visible
+ * @returns {Promise<void>}
+ */
+async function refreshPortalAccessButtons(rpc, changedIds) {
+    const buttons = {};
+    for (const button of document.querySelectorAll(`button[id^="${PORTAL_ACCESS_BUTTON_PREFIX}"]`)) {
+        const res_id = parseInt(button.id.slice(PORTAL_ACCESS_BUTTON_PREFIX.length));
+        (buttons[res_id] ||= []).push(button);
+    }
+    const partnerIds = Object.keys(buttons).map(Number);
+    if (!partnerIds.length || (changedIds && !changedIds.some((id) => id in buttons))) {
+        return;
+    }
+
+    const statuses = await rpc("/easy_grant_portal/portal_access", { partner_ids: partnerIds });
+    for (const [res_id, portal_access] of Object.entries(statuses)) {
+        for (const button of buttons[res_id] || []) {
+            updatePortalAccessButton(button, portal_access);
+        }
+    }
+}
+
+registry.category("actions").add("refresh_portal_access_button", async function (env, { params }) {
+    const notification = env.services.notification;
+    const dialog = env.services.dialog;
+
+    // Bulk actions return one result per partner
+    const results = Array.isArray(params) ? params : [params];
+    const failures = results.filter((result) => !result.success);
+    for (const { message } of failures) {
+        notification.add(`Error: ${message}`, { type: "danger" });
+    }
+    if (failures.length === results.length) {
+        return;
+    }
+
+    env.services.portal_access.markOwnChanges(
+        results.filter((result) => result.success).map((result) => result.res_id)
+    );
+    await refreshPortalAccessButtons(env.services.rpc);
 
     dialog.closeAll(); // This only fires on success, by design
 });
 
+/**
+ * Keeps visible portal access buttons in sync with changes made by other users
+ */
+export const portalAccessService = {
+    dependencies: ["bus_service", "rpc"],
+    start(env, { bus_service, rpc }) {
+        // Partners this client changed itself, and already refreshed from the returned action
+        const ownChanges = new Set();
+        bus_service.subscribe("easy_grant_portal/portal_access_changed", ({ partner_ids }) => {
+            const changedIds = partner_ids.filter((id) => !ownChanges.delete(id));
+            if (changedIds.length) {
+                refreshPortalAccessButtons(rpc, changedIds);
+            }
+        });
+        return {
+            refresh: (changedIds) => refreshPortalAccessButtons(rpc, changedIds),
+            markOwnChanges(partnerIds) {
+                for (const id of partnerIds) {
+                    ownChanges.add(id);
+                    setTimeout(() => ownChanges.delete(id), OWN_CHANGE_TTL);
+                }
+            },
+        };
+    },
+};
+registry.category("services").add("portal_access", portalAccessService);
+
 /**
  * Patch FormRenderer to add portal revoke note validation
  */
@@ -0,0 +1,2 @@
+from . import test_portal_queries
+from . import test_portal_grant_concurrency
@@ -0,0 +1,73 @@
+import threading
+
+import odoo
+from odoo import SUPERUSER_ID, api
+from odoo.service.model import retrying
+from odoo.tests import BaseCase, tagged
+from odoo.tests.common import get_db_name
+
+
+@tagged('post_install', '-at_install')
+class TestPortalGrantConcurrency(BaseCase):
+    """Concurrent grants on real, committed transactions of the local test database."""
+
+    THREADS = 8
+
+    def setUp(self):
+        super().setUp()
+        self.registry = odoo.registry(get_db_name())
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            partners = env['res.partner'].create([
+                {'name': f'Concurrent {i}', 'email': f'concurrent.{i}@example.com'}
+                for i in range(self.THREADS)
+            ])
+            self.partner_ids = partners.ids
+        self.addCleanup(self._cleanup)
+
+    def _cleanup(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {'active_test': False})
+            partners = env['res.partner'].browse(self.partner_ids)
+            env['res.users'].search([('login', 'in', partners.mapped('email'))]).unlink()
+            partners.unlink()
+
+    def _grant_concurrently(self, partner_ids):
+        """Grant access to each partner id from its own thread and transaction."""
+        results, barrier = [None] * len(partner_ids), threading.Barrier(len(partner_ids))
+
+        def grant(index, partner_id):
+            # Like the test thread, make ir.mail_server skip sending the invitation emails
+            threading.current_thread().testing = True
+            barrier.wait()
+            with self.registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                results[index] = retrying(lambda: env['res.users'].grant_portal_access(partner_id), env)
+
+        threads = [threading.Thread(target=grant, args=(index, partner_id))
+                   for index, partner_id in enumerate(partner_ids)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _users(self, emails):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {'active_test': False})
+            return env['res.users'].search_count([('login', 'in', emails)])
+
+    def test_same_email_is_granted_once(self):
+        partner_id = self.partner_ids[0]
+        results = self._grant_concurrently([partner_id] * self.THREADS)
+
+        self.assertNotIn(None, results, "every thread must return a result")
+        self.assertEqual(sum(result['success'] for result in results), 1, results)
+        self.assertEqual(self._users(['concurrent.0@example.com']), 1)
+
+    def test_different_emails_are_all_granted(self):
+        results = self._grant_concurrently(self.partner_ids)
+
+        self.assertTrue(all(result['success'] for result in results), results)
+        self.assertEqual(self._users([f'concurrent.{i}@example.com' for i in range(self.THREADS)]),
+                         self.THREADS)
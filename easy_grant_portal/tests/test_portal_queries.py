@@ -0,0 +1,39 @@
+from odoo import Command
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestPortalQueries(TransactionCase):
+    """The portal computes must not issue one query per partner (that is, 10 or more here)."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env['res.partner'].create([
+            {'name': f'Portal {i}', 'email': f'portal.{i}@example.com'} for i in range(10)
+        ])
+        cls.users = cls.env['res.users'].create([{
+            'name': partner.name,
+            'login': partner.email,
+            'partner_id': partner.id,
+            'groups_id': [Command.set([cls.env.ref('base.group_portal').id])],
+            'portal_revoke_note': f'Reason {i}',
+        } for i, partner in enumerate(cls.partners)])
+        cls.users[5:].active = False
+
+    def test_portal_access_is_batched(self):
+        self.env.invalidate_all()
+        with self.assertQueryCount(6):
+            access = self.partners.mapped('portal_access')
+        self.assertEqual(access, ['active'] * 5 + ['revoked'] * 5)
+
+    def test_portal_revoke_note_is_batched(self):
+        self.env.invalidate_all()
+        with self.assertQueryCount(6):
+            notes = self.partners.mapped('portal_revoke_note')
+        self.assertEqual(notes, [f'Reason {i}' for i in range(10)])
+
+        self.env.invalidate_all()
+        with self.assertQueryCount(6):
+            self.partners.portal_revoke_note = 'Moved'
+        self.assertEqual(set(self.users.mapped('portal_revoke_note')), {'Moved'})
@@ -23,3 +23,4 @@ from . import controllers
 from . import models
 from . import wizards
 from . import session
+from . import session_store
@@ -34,7 +34,9 @@
     'depends': ['web', 'website', 'portal'],
     'data': [
         'security/ir.model.access.csv',
+        'data/ir_cron.xml',
         'wizards/user_selection_views.xml',
+        'views/impersonation_session_views.xml',
         'views/portal_templates.xml',
         'views/res_partner.xml',
     ],
@@ -38,7 +38,9 @@ class UserSwitch(http.Controller):
     def user_switch(self):
         """
             Summary:
-                function to check weather the user is admin
+                function to check weather the user is admin. The backend
+                systray reads this from session_info instead; the route is
+                kept for other callers.
             Return:
                 weather the current user is admin or not
         """
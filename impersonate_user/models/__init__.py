@@ -19,5 +19,7 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ###############################################################################
-from . import res_groups
 from . import res_partner
+from . import res_users
+from . import ir_http
+from . import impersonation_session
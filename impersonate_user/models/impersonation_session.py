@@ -0,0 +1,120 @@
+import hashlib
+import logging
+from datetime import timedelta
+
+from odoo import api, fields, http, models, tools
+
+_logger = logging.getLogger(__name__)
+
+# Impersonations older than this are expired, unless overridden by the
+# impersonate_user.max_age_hours system parameter
+DEFAULT_MAX_AGE_HOURS = 4
+
+
+def hash_sid(sid):
+    """Hash of a session id, so the registry never holds a usable session id."""
+    return hashlib.sha256(sid.encode()).hexdigest()
+
+
+class ImpersonationSession(models.Model):
+    """
+    Server-side registry of impersonations.
+
+    A row is written when an impersonation starts and closed when it ends, so
+    active impersonations can be listed, expired and terminated with a single
+    query instead of scanning the session store. A session whose impersonation
+    is closed here is logged out on its next request.
+    """
+    _name = 'impersonation.session'
+    _description = 'Impersonation Session'
+    _order = 'start_time desc, id desc'
+    _rec_name = 'user_id'
+
+    origin_user_id = fields.Many2one('res.users', string="Impersonator",
+                                     required=True, readonly=True, index=True,
+                                     ondelete='cascade')
+    user_id = fields.Many2one('res.users', string="Impersonated User",
+                              required=True, readonly=True, index=True,
+                              ondelete='cascade')
+    start_time = fields.Datetime(string="Started", required=True,
+                                 readonly=True,
+                                 default=fields.Datetime.now)
+    end_time = fields.Datetime(string="Ended", readonly=True)
+    state = fields.Selection([('active', 'Active'),
+                              ('ended', 'Ended'),
+                              ('expired', 'Expired'),
+                              ('terminated', 'Terminated')],
+                             string="Status", required=True, readonly=True,
+                             default='active')
+    sid_hash = fields.Char(string="Session Hash", readonly=True, copy=False,
+                           groups='base.group_system',
+                           help="SHA-256 of the session id; the id itself is never stored")
+
+    def init(self):
+        # Sweeps and listings only ever look at the active impersonations
+        tools.create_index(self._cr, 'impersonation_session_active_start_index',
+                           self._table, ['start_time'],
+                           where="state = 'active'")
+
+    @api.model
+    def _get_max_age(self):
+        """Return the configured maximum age of an impersonation as a timedelta."""
+        hours = self.env['ir.config_parameter'].sudo().get_param(
+            'impersonate_user.max_age_hours', DEFAULT_MAX_AGE_HOURS)
+        try:
+            return timedelta(hours=float(hours))
+        except (TypeError, ValueError):
+            return timedelta(hours=DEFAULT_MAX_AGE_HOURS)
+
+    def _close(self, state):
+        """Close the given active impersonations in one query, returning their session hashes."""
+        if not self:
+            return []
+        self.env.cr.execute("""
+            UPDATE impersonation_session
+               SET state = %s, end_time = (now() AT TIME ZONE 'UTC')
+             WHERE id IN %s AND state = 'active'
+         RETURNING sid_hash
+        """, [state, tuple(self.ids)])
+        sid_hashes = [sid_hash for sid_hash, in self.env.cr.fetchall()]
+        self.invalidate_recordset(['state', 'end_time'])
+        return sid_hashes
+
+    @api.model
+    def _is_active(self, record_id):
+        """Whether the impersonation recorded under record_id is still active."""
+        self.env.cr.execute("SELECT state FROM impersonation_session WHERE id = %s", [record_id])
+        row = self.env.cr.fetchone()
+        return bool(row) and row[0] == 'active'
+
+    @api.model
+    def _cron_expire_stale(self):
+        """Expire and log out every impersonation older than the maximum age."""
+        limit = fields.Datetime.now() - self._get_max_age()
+        self.env.cr.execute("""
+            UPDATE impersonation_session
+               SET state = 'expired', end_time = (now() AT TIME ZONE 'UTC')
+             WHERE state = 'active' AND start_time < %s
+         RETURNING sid_hash
+        """, [limit])
+        sid_hashes = [sid_hash for sid_hash, in self.env.cr.fetchall()]
+        self.invalidate_model(['state', 'end_time'])
+        self._logout_sessions(sid_hashes)
+        if sid_hashes:
+            _logger.info("Expired %s stale impersonation(s)", len(sid_hashes))
+
+    def action_terminate(self):
+        """Terminate the selected impersonations and log their sessions out."""
+        self._logout_sessions(self._close('terminated'))
+
+    @api.model
+    def _logout_sessions(self, sid_hashes):
+        """
+        Remove the sessions with the given hashes right away when the session store can
+        look them up by hash. Any other session is logged out on its next request, by
+        ir.http, since its impersonation is no longer active.
+        """
+        store = http.root.session_store
+        sid_hashes = [sid_hash for sid_hash in sid_hashes if sid_hash]
+        if sid_hashes and hasattr(store, 'delete_hashed'):
+            store.delete_hashed(sid_hashes)
@@ -0,0 +1,27 @@
+from odoo import api, models
+from odoo.http import request
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = 'ir.http'
+
+    @classmethod
+    def _authenticate(cls, endpoint):
+        """Log out sessions whose impersonation was terminated or expired in the registry."""
+        record_id = request.session.get('impersonation_session_id')
+        if record_id and not request.env['impersonation.session'].sudo()._is_active(record_id):
+            request.session.logout(keep_db=True)
+            request.env = api.Environment(request.env.cr, None, request.session.context)
+        return super()._authenticate(endpoint)
+
+    def session_info(self):
+        """Expose the impersonation capability and state so the systray needs no extra RPC."""
+        result = super().session_info()
+        result.update(self._get_impersonation_info())
+        return result
+
+    def _get_impersonation_info(self):
+        return {
+            'can_impersonate': request.env.user._is_admin(),
+            'impersonation_active': bool(request.session.get('impersonation_banner')),
+        }
@@ -1,5 +1,6 @@
 from odoo import models, fields, api, _
 from odoo.http import request
+from odoo.tools.sql import create_index
 
 class ResPartner(models.Model):
     _inherit = "res.partner"
@@ -10,14 +11,31 @@ class ResPartner(models.Model):
         string="Portal Access Status",
     )
 
+    def init(self):
+        super().init()
+        # Trigram index for the user picker's type-ahead, which matches on the user's name.
+        # Custom-named: core's btree res_partner_name_index would make index='trigram' a no-op
+        if self.env.registry.has_trigram:
+            create_index(self.env.cr, 'res_partner_name_trgm_index', self._table,
+                         ['"name" gin_trgm_ops'], method='gin')
+
     @api.depends('user_ids', 'user_ids.groups_id')
     def _compute_portal_access(self):
         """Compute if the partner has portal access based on their user groups."""
         portal_group = self.env.ref('base.group_portal')
+
+        # Look up the deactivated users of the whole batch in a single query
+        emails = [email for email in set(self.mapped('email')) if email]
+        revoked_logins = set()
+        if emails:
+            revoked_logins = set(self.env['res.users'].search([
+                ('login', 'in', emails), ('active', '=', False),
+            ]).mapped('login'))
+
         for partner in self:
             if any(portal_group in user.groups_id for user in partner.user_ids):
                 partner.portal_access = 'active'
-            elif self.env['res.users'].search([('login', '=', partner.email), ('active', 'in', [False])], limit=1):
+            elif partner.email in revoked_logins:
                 partner.portal_access = 'revoked'
             else:
                 partner.portal_access = 'none'
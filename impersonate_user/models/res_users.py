@@ -0,0 +1,8 @@
+from odoo import fields, models
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    # Trigram index so the user picker's type-ahead stays fast on large user tables
+    login = fields.Char(index='trigram')
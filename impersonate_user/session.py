@@ -19,12 +19,18 @@
 #    If not, see <http://www.gnu.org/licenses/>.
 #
 ###############################################################################
+import logging
+import time
+
 import odoo
-from odoo import fields
+from odoo import fields, http
 from odoo.http import request, Session
-from odoo.modules.registry import Registry
 from datetime import timedelta
 
+from .models.impersonation_session import DEFAULT_MAX_AGE_HOURS, hash_sid
+
+_logger = logging.getLogger(__name__)
+
 
 def authenticate_without_password(self, dbname, login, env):
     """Function for login without password"""
@@ -34,32 +40,66 @@ def authenticate_without_password(self, dbname, login, env):
         self.impersonation_start_time = None
 
     # Store current user before switching
+    origin_id = None
     if env and env.user:
-        self.impersonation_origin_id = env.user.id
+        origin_id = env.user.id
+        self.impersonation_origin_id = origin_id
         self.impersonation_active = True
         self.impersonation_start_time = fields.Datetime.now()
 
     # Mark session as modified
     self.modified = True
 
-    registry = Registry(dbname)
-    pre_uid = env['res.users'].search([("login", '=', login)]).id
+    # Resolve the target uid once, on the caller's cursor
+    pre_uid = env['res.users'].search([("login", '=', login)], limit=1).id
+    self._switch_to_user(env, pre_uid, login)
+    if origin_id:
+        self._register_impersonation(env, origin_id, pre_uid)
+        # Precompute the banner so web.layout only has to check one session key
+        if self.uid and self.uid != origin_id:
+            self.impersonation_banner = env['res.users'].browse(self.uid).name
+    return pre_uid
+
+
+def _register_impersonation(self, env, origin_id, uid):
+    """Record the impersonation in the server-side registry."""
+    # Rotate now rather than at the end of the request, so the registry
+    # records the session id the browser will actually use
+    if self.should_rotate:
+        http.root.session_store.rotate(self, env)
+    record = env['impersonation.session'].sudo().create({
+        'origin_user_id': origin_id,
+        'user_id': uid,
+        'start_time': self.impersonation_start_time,
+        'sid_hash': hash_sid(self.sid),
+    })
+    self.impersonation_session_id = record.id
+
+
+def _switch_to_user(self, env, uid, login):
+    """
+    Switch the session to the given user using the caller's cursor.
+
+    No extra pooled connection or transaction is opened: the MFA check and the
+    session finalization both run on ``env.cr``.
+    """
+    start = time.perf_counter()
     self.uid = None
     self.pre_login = login
-    self.pre_uid = pre_uid
+    self.pre_uid = uid
 
-    with registry.cursor() as cr:
-        env = odoo.api.Environment(cr, pre_uid, {})
-        # If 2FA is disabled we finalize immediately
-        user = env['res.users'].browse(pre_uid)
-        if not user._mfa_url():
-            self.finalize(env)
+    # If 2FA is disabled we finalize immediately
+    user_env = env(user=uid)
+    if not user_env.user._mfa_url():
+        self.finalize(user_env)
 
-    if request and request.session is self and request.db == dbname:
+    if request and request.session is self and request.db == env.cr.dbname:
         request.env = odoo.api.Environment(request.env.cr, self.uid, self.context)
         request.update_context(**self.context)
 
-    return pre_uid
+    _logger.info("Impersonation switch to %s (uid %s) took %.1f ms",
+                 login, uid, (time.perf_counter() - start) * 1000)
+    return uid
 
 
 def init(self, *args, **kwargs):
@@ -78,16 +118,11 @@ def switch_back_user(self):
     original_uid = self.impersonation_origin_id
 
     # Clear impersonation state before switching
-    self.impersonation_origin_id = None
-    self.modified = True
-
-    # Get original user's login
-    with Registry(self.db).cursor() as cr:
-        env = odoo.api.Environment(cr, original_uid, {})
-        login = env['res.users'].browse(original_uid).login
+    self.clear_impersonation()
 
-        # Switch back using existing secure method
-        return self.authenticate_without_password(self.db, login, env)
+    # Get original user's login on the request cursor and switch back to it
+    env = request.env(user=original_uid)
+    return self._switch_to_user(env, original_uid, env.user.login)
 
 
 def check_impersonation_validity(self):
@@ -95,19 +130,27 @@ def check_impersonation_validity(self):
     if not self.impersonation_active or not self.impersonation_start_time:
         return False
 
-    # Timeout check (defaults to 4 hours)
-    max_age = timedelta(hours=4)
+    # Timeout check (defaults to 4 hours, see impersonate_user.max_age_hours)
+    if request:
+        max_age = request.env['impersonation.session']._get_max_age()
+    else:
+        max_age = timedelta(hours=DEFAULT_MAX_AGE_HOURS)
     now = fields.Datetime.now()
     impersonation_age = now - self.impersonation_start_time
 
     if impersonation_age > max_age:
-        self.clear_impersonation()
+        self.clear_impersonation(state='expired')
         return False
 
     return True
 
-def clear_impersonation(self):
+def clear_impersonation(self, state='ended'):
     """Clear all impersonation-related session data"""
+    if self.impersonation_session_id and request:
+        request.env['impersonation.session'].sudo().browse(
+            self.impersonation_session_id)._close(state)
+    self.impersonation_session_id = None
+    self.impersonation_banner = None
     self.impersonation_origin_id = None
     self.impersonation_active = False
     self.impersonation_start_time = None
@@ -115,6 +158,8 @@ def clear_impersonation(self):
 
 
 Session.authenticate_without_password = authenticate_without_password
+Session._switch_to_user = _switch_to_user
+Session._register_impersonation = _register_impersonation
 Session.init = init
 Session.switch_back_user = switch_back_user
 Session.check_impersonation_validity = check_impersonation_validity
@@ -0,0 +1,196 @@
+"""
+Shared HTTP session store backed by PostgreSQL.
+
+Odoo keeps sessions in a per-node filesystem directory, so logins and
+impersonation state are lost when a load balancer sends a request to another
+node, and session GC has to walk the whole directory tree. Setting
+``SESSION_STORE=postgres`` replaces that store with a single table shared by
+every worker and node:
+
+    - SESSION_STORE: 'filesystem' (default, Odoo's store) or 'postgres'
+    - SESSION_STORE_DSN: libpq connection string; defaults to the Odoo
+      database connection settings and ``db_name``, one of which is required
+    - SESSION_STORE_POOL_SIZE: connections per worker process (default 4);
+      requests beyond it wait for a free connection
+
+Sessions expire after ``odoo.http.SESSION_LIFETIME`` without activity, and
+the impersonation fields are stored in their own indexed columns rather than
+in the JSON payload, next to the indexed hash of the session id the
+impersonation registry refers to sessions by.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.pool
+
+import odoo
+from odoo import fields, http
+from odoo.tools import config
+
+from .models.impersonation_session import hash_sid
+
+_logger = logging.getLogger(__name__)
+
+SESSION_STORE = os.getenv('SESSION_STORE', 'filesystem').strip().lower()
+SESSION_STORE_DSN = os.getenv('SESSION_STORE_DSN', '')
+SESSION_STORE_POOL_SIZE = int(os.getenv('SESSION_STORE_POOL_SIZE', '4'))
+
+# Session keys stored in their own columns instead of the JSON payload
+IMPERSONATION_FIELDS = ('impersonation_origin_id', 'impersonation_active',
+                        'impersonation_start_time')
+
+
+class PostgresSessionStore(http.FilesystemSessionStore):
+    """Session store keeping every session in one PostgreSQL table with a TTL."""
+
+    table = 'odoo_http_session'
+
+    def __init__(self, dsn=None, dbname=None, pool_size=SESSION_STORE_POOL_SIZE, **kwargs):
+        super().__init__(config.session_dir, session_class=http.Session,
+                         renew_missing=True, **kwargs)
+        self.dsn = dsn
+        self.dbname = dbname or (config['db_name'] or '').split(',')[0].strip()
+        if not (self.dsn or self.dbname):
+            raise ValueError("SESSION_STORE=postgres requires SESSION_STORE_DSN or a "
+                             "db_name to hold the session table")
+        self.pool_size = pool_size
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._slots = None
+
+    def _connection_info(self):
+        if self.dsn:
+            return {'dsn': self.dsn}
+        _dbname, info = odoo.sql_db.connection_info_for(self.dbname)
+        return info
+
+    def _get_pool(self):
+        # Prefork workers must not share the master's sockets, so the pool is
+        # (re)created lazily in every process
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        1, self.pool_size, **self._connection_info())
+                    # getconn() raises PoolError when the pool is exhausted, so
+                    # requests wait for a free slot instead
+                    self._slots = threading.BoundedSemaphore(self.pool_size)
+                    self._pool_pid = os.getpid()
+                    self._create_table()
+        return self._pool
+
+    @contextmanager
+    def _cursor(self):
+        pool = self._get_pool()
+        with self._slots:
+            conn = pool.getconn()
+            try:
+                with conn:
+                    with conn.cursor() as cr:
+                        yield cr
+            finally:
+                pool.putconn(conn)
+
+    def _create_table(self):
+        # Called with the pool freshly created, before any slot is taken
+        conn = self._pool.getconn()
+        try:
+            with conn, conn.cursor() as cr:
+                cr.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        sid varchar PRIMARY KEY,
+                        sid_hash varchar NOT NULL,
+                        data jsonb NOT NULL,
+                        uid integer,
+                        impersonation_origin_id integer,
+                        impersonation_active boolean NOT NULL DEFAULT false,
+                        impersonation_start_time timestamp,
+                        expires_at timestamp NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS {self.table}_sid_hash_index
+                        ON {self.table} (sid_hash);
+                    CREATE INDEX IF NOT EXISTS {self.table}_expires_at_index
+                        ON {self.table} (expires_at);
+                    CREATE INDEX IF NOT EXISTS {self.table}_impersonation_index
+                        ON {self.table} (impersonation_origin_id)
+                        WHERE impersonation_active;
+                """)
+        finally:
+            self._pool.putconn(conn)
+
+    def get(self, sid):
+        if not self.is_valid_key(sid):
+            return self.new()
+        with self._cursor() as cr:
+            cr.execute(f"""
+                SELECT data, impersonation_origin_id, impersonation_active,
+                       impersonation_start_time
+                  FROM {self.table}
+                 WHERE sid = %s AND expires_at > (now() AT TIME ZONE 'UTC')
+            """, [sid])
+            row = cr.fetchone()
+        if not row:
+            return self.new()
+        data, origin_id, active, start_time = row
+        data.update(impersonation_origin_id=origin_id,
+                    impersonation_active=active,
+                    impersonation_start_time=start_time)
+        return self.session_class(data, sid, False)
+
+    def save(self, session):
+        data = dict(session)
+        impersonation = [data.pop(key, None) for key in IMPERSONATION_FIELDS]
+        origin_id, active, start_time = impersonation
+        with self._cursor() as cr:
+            cr.execute(f"""
+                INSERT INTO {self.table} (sid, sid_hash, data, uid,
+                                          impersonation_origin_id,
+                                          impersonation_active,
+                                          impersonation_start_time, expires_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s,
+                        (now() AT TIME ZONE 'UTC') + %s * interval '1 second')
+                ON CONFLICT (sid) DO UPDATE
+                   SET data = EXCLUDED.data,
+                       uid = EXCLUDED.uid,
+                       impersonation_origin_id = EXCLUDED.impersonation_origin_id,
+                       impersonation_active = EXCLUDED.impersonation_active,
+                       impersonation_start_time = EXCLUDED.impersonation_start_time,
+                       expires_at = EXCLUDED.expires_at
+            """, [session.sid, hash_sid(session.sid), json.dumps(data, default=str),
+                  data.get('uid'), origin_id or None, bool(active),
+                  fields.Datetime.to_datetime(start_time) if start_time else None,
+                  http.SESSION_LIFETIME])
+
+    def delete(self, session):
+        with self._cursor() as cr:
+            cr.execute(f"DELETE FROM {self.table} WHERE sid = %s", [session.sid])
+
+    def delete_hashed(self, sid_hashes):
+        """Delete the sessions whose id hashes (see impersonation_session.hash_sid) are given."""
+        with self._cursor() as cr:
+            cr.execute(f"DELETE FROM {self.table} WHERE sid_hash = ANY(%s)", [list(sid_hashes)])
+
+    def vacuum(self, max_lifetime=http.SESSION_LIFETIME):
+        """Drop every session idle for longer than max_lifetime in one statement."""
+        with self._cursor() as cr:
+            cr.execute(f"""
+                DELETE FROM {self.table}
+                 WHERE expires_at < (now() AT TIME ZONE 'UTC')
+                                    + GREATEST(%s - %s, 0) * interval '1 second'
+            """, [http.SESSION_LIFETIME, max_lifetime])
+            _logger.info("Removed %s expired HTTP sessions", cr.rowcount)
+
+
+if SESSION_STORE == 'postgres':
+    # Replace the lazily computed store of the running application
+    http.root.session_store = PostgresSessionStore(dsn=SESSION_STORE_DSN or None)
+    _logger.info("HTTP sessions stored in PostgreSQL table %s",
+                 PostgresSessionStore.table)
+elif SESSION_STORE != 'filesystem':
+    _logger.warning("Unknown SESSION_STORE %r, keeping the filesystem session store",
+                    SESSION_STORE)
@@ -1,9 +1,27 @@
 /** @odoo-module **/
 import { registry } from "@web/core/registry";
+import { session } from "@web/session";
 import { useService } from "@web/core/utils/hooks";
-import { useState } from "@odoo/owl";
+import { reactive, useState } from "@odoo/owl";
 const { Component } = owl;
 
+/**
+ * Impersonation capability and state, seeded from session_info so rendering the
+ * systray needs no request. Impersonation is per session and switching reloads the
+ * page, so the state never changes under a running client.
+ */
+export const impersonationState = reactive({
+    canImpersonate: Boolean(session.can_impersonate),
+    active: Boolean(session.impersonation_active),
+});
+
+export const impersonationService = {
+    start() {
+        return impersonationState;
+    },
+};
+registry.category("services").add("impersonate_user", impersonationService);
+
 /** @extends {Component<UserSwitchWidget>} for switching users */
 export class UserSwitchWidget extends Component {
 
@@ -18,38 +36,27 @@ export class UserSwitchWidget extends Component {
         super.setup();
         this.rpc = useService("rpc");
         this.action = useService("action");
-        this.state = useState({
-            isAdmin: false,
-            isVisible: false
-        });
-
-        // Only check visibility if not in test mode OR if test explicitly enables it
-        if (!this._isInTestMode() || this.env.testEnableUserSwitch) {
-            this._controlVisibility();
-        }
+        this.state = useState(useService("impersonate_user"));
     }
 
     _isInTestMode() {
         return typeof QUnit !== 'undefined' && QUnit.config?.current;
     }
 
-    async _controlVisibility() {
-        try {
-            this.state.isVisible = await this.rpc("/switch/user");
-        } catch (error) {
-            // In test mode, silently fail to avoid test pollution
-            if (this._isInTestMode()) {
-                this.state.isVisible = false;
-            } else {
-                console.error("Error checking user switch visibility:", error);
-                this.state.isVisible = false;
-            }
+    get isVisible() {
+        // Hidden in test mode unless the test explicitly enables it
+        if (this._isInTestMode() && !this.env.testEnableUserSwitch) {
+            return false;
         }
+        return this.state.canImpersonate || this.state.active;
     }
 
     async _onClick() {
-        var result = await this.rpc("/switch/user", {});
-        if (result == true) {
+        if (this.state.active) {
+            this.rpc("/switch/back", {}).then(function () {
+                location.reload();
+            })
+        } else if (this.state.canImpersonate) {
             this.action.doAction({
                 type: 'ir.actions.act_window',
                 name: 'Switch User',
@@ -60,10 +67,6 @@ export class UserSwitchWidget extends Component {
                 ],
                 target: 'new'
             })
-        } else {
-            this.rpc("/switch/back", {}).then(function () {
-                location.reload();
-            })
         }
     }
 }
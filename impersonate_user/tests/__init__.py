@@ -0,0 +1,2 @@
+from . import test_session_store
+from . import test_banner_benchmark
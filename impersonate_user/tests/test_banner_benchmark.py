@@ -0,0 +1,43 @@
+import logging
+import statistics
+import time
+
+from odoo.tests import HttpCase, tagged
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged('post_install', '-at_install', '-standard', 'impersonate_user_benchmark')
+class TestBannerRenderBenchmark(HttpCase):
+    """
+    Render cost of the impersonation banner on a public page outside an impersonation,
+    compared to the same page with the banner view archived. Not part of the standard
+    suite; run it with --test-tags=impersonate_user_benchmark.
+    """
+
+    ROUNDS = 50
+
+    def _measure(self, url):
+        self.url_open(url)  # warm the view and asset caches
+        durations, queries = [], []
+        for _i in range(self.ROUNDS):
+            count, started = self.cr.sql_log_count, time.perf_counter()
+            response = self.url_open(url)
+            durations.append(time.perf_counter() - started)
+            queries.append(self.cr.sql_log_count - count)
+            self.assertEqual(response.status_code, 200)
+        return statistics.median(durations), statistics.median(queries)
+
+    def test_public_page_without_impersonation(self):
+        banner = self.env.ref('impersonate_user.impersonation_header_home')
+        with_banner, with_queries = self._measure('/')
+        banner.active = False
+        without_banner, without_queries = self._measure('/')
+
+        _logger.info("Public page render: %.2fms with the banner view, %.2fms without "
+                     "(%+.2fms), %s vs %s queries (median of %s)",
+                     with_banner * 1000, without_banner * 1000,
+                     (with_banner - without_banner) * 1000,
+                     with_queries, without_queries, self.ROUNDS)
+        self.assertLessEqual(with_queries, without_queries,
+                             "the banner check must not query the database")
@@ -0,0 +1,112 @@
+import datetime
+import os
+import threading
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.impersonate_user.models.impersonation_session import hash_sid
+from odoo.addons.impersonate_user.session_store import PostgresSessionStore
+
+
+class LocalSessionStore(PostgresSessionStore):
+    """Store using a private table of the test database as a local stand-in."""
+
+    table = f'test_odoo_http_session_{os.getpid()}'
+
+
+@tagged('post_install', '-at_install')
+class TestPostgresSessionStore(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.store = LocalSessionStore(dbname=self.env.cr.dbname, pool_size=2)
+        self.addCleanup(self._drop_store)
+
+    def _drop_store(self):
+        with self.store._cursor() as cr:
+            cr.execute(f"DROP TABLE IF EXISTS {self.store.table}")
+        self.store._pool.closeall()
+
+    def _new_session(self, **values):
+        session = self.store.new()
+        session.update(values)
+        return session
+
+    def test_round_trip_with_native_impersonation_columns(self):
+        started = fields.Datetime.now()
+        session = self._new_session(uid=2, login='admin', impersonation_origin_id=2,
+                                    impersonation_active=True, impersonation_start_time=started)
+        self.store.save(session)
+
+        loaded = self.store.get(session.sid)
+        self.assertEqual(loaded.sid, session.sid)
+        self.assertEqual(loaded['login'], 'admin')
+        self.assertEqual(loaded['impersonation_origin_id'], 2)
+        self.assertTrue(loaded['impersonation_active'])
+        self.assertEqual(loaded['impersonation_start_time'], started)
+
+        with self.store._cursor() as cr:
+            cr.execute(f"""
+                SELECT uid, impersonation_origin_id, impersonation_active,
+                       data ? 'impersonation_active'
+                  FROM {self.store.table} WHERE sid = %s
+            """, [session.sid])
+            self.assertEqual(cr.fetchone(), (2, 2, True, False))
+
+    def test_unknown_and_expired_sessions_are_new(self):
+        self.assertTrue(self.store.get(self.store.generate_key()).is_new)
+
+        session = self._new_session(uid=2)
+        self.store.save(session)
+        with self.store._cursor() as cr:
+            cr.execute(f"UPDATE {self.store.table} SET expires_at = %s WHERE sid = %s",
+                       [datetime.datetime.utcnow() - datetime.timedelta(seconds=1), session.sid])
+        self.assertTrue(self.store.get(session.sid).is_new)
+
+        self.store.vacuum()
+        with self.store._cursor() as cr:
+            cr.execute(f"SELECT count(*) FROM {self.store.table}")
+            self.assertEqual(cr.fetchone()[0], 0)
+
+    def test_delete(self):
+        session = self._new_session(uid=2)
+        self.store.save(session)
+        self.store.delete(session)
+        self.assertTrue(self.store.get(session.sid).is_new)
+
+    def test_delete_hashed(self):
+        kept, deleted = self._new_session(uid=2), self._new_session(uid=2)
+        self.store.save(kept)
+        self.store.save(deleted)
+        self.store.delete_hashed([hash_sid(deleted.sid)])
+        self.assertTrue(self.store.get(deleted.sid).is_new)
+        self.assertFalse(self.store.get(kept.sid).is_new)
+
+    def test_more_concurrent_requests_than_connections(self):
+        """Requests beyond the pool size wait for a connection instead of failing."""
+        errors = []
+        barrier = threading.Barrier(8)
+
+        def request():
+            try:
+                barrier.wait()
+                for _i in range(5):
+                    session = self._new_session(uid=2)
+                    self.store.save(session)
+                    self.assertEqual(self.store.get(session.sid)['uid'], 2)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=request) for _i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_requires_a_database(self):
+        with patch.dict('odoo.tools.config.options', db_name=False):
+            with self.assertRaises(ValueError):
+                LocalSessionStore()
@@ -23,10 +23,10 @@ from odoo import api, fields, models
 from odoo.http import request
 
 
-class UserSelection(models.Model):
+class UserSelection(models.TransientModel):
     """
         class for a wizard for users selection
-        _onchange_user_id:
+        _compute_access_ids:
             function to get corresponding user group
         action_switch:
             function for switching the user
@@ -37,20 +37,21 @@ class UserSelection(models.Model):
     user_id = fields.Many2one('res.users', string="User",
                               required=True,
                               help="Select the user here",
-                              domain=lambda self: [
-                                  ('id', '!=', self.env.user.id)])
-    access_ids = fields.One2many('res.groups',
-                                 'user_id',
-                                 help="User groups for the selection",
-                                 string="Group", readonly=True)
+                              domain=lambda self: self._get_user_domain())
+    access_ids = fields.Many2many('res.groups',
+                                  compute='_compute_access_ids',
+                                  help="User groups for the selection",
+                                  string="Group")
 
-    @api.onchange('user_id')
-    def _onchange_user_id(self):
+    @api.depends('user_id')
+    def _compute_access_ids(self):
         """
             Summary:
-                change function to get users access group
+                compute function to get users access group, read-only so
+                selecting a user never writes to res.groups
         """
-        self.access_ids = self.user_id.groups_id
+        for wizard in self:
+            wizard.access_ids = wizard.user_id.groups_id
 
     def action_switch(self):
         """
@@ -73,12 +74,19 @@ class UserSelection(models.Model):
         }
 
     @api.model
-    def _search_users(self):
-        domain = []
+    def _get_user_domain(self):
+        """
+        Summary:
+            domain of the users that can be selected, scoped to portal
+            users when the portal_only context key is set
+        Return:
+            search domain on res.users
+        """
+        domain = [('id', '!=', self.env.user.id)]
         if self.env.context.get('portal_only'):
-            domain = [
+            domain += [
                 ('active', '=', True),
                 ('groups_id', 'in', self.env.ref('base.group_portal').id),
-                ('groups_id', 'not_in', self.env.ref('base.group_user').id)
+                ('groups_id', 'not in', self.env.ref('base.group_user').id)
             ]
-        return self.env['res.users'].search(domain)
+        return domain
@@ -3,7 +3,10 @@ import hashlib
 import hmac
 import logging
 import time
+from functools import lru_cache
+
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESSIV
 
 from odoo import _, http, api
 from odoo.exceptions import AccessDenied
@@ -83,6 +86,90 @@ def fernet_decrypt(secret, ciphertext):
         raise AccessDenied("Decryption failed.") from e
     return plaintext.decode('utf-8')
 
+@lru_cache(maxsize=8)
+def _siv_cipher(secret):
+    """
+    Build the AES-SIV cipher for the provided secret.
+    The 512-bit key (AES-256-SIV) is derived with HMAC-SHA512, so it differs from the
+    Fernet key of the same secret. Cached, as templates encrypt many values per render.
+
+    :param secret: The secret string (e.g. the database secret).
+    :returns: An AESSIV instance.
+
+    Sources:
+        - https://cryptography.io/en/latest/hazmat/primitives/aead/#cryptography.hazmat.primitives.ciphers.aead.AESSIV
+        - https://datatracker.ietf.org/doc/html/rfc5297
+    """
+    key = hmac.new(secret.encode('utf-8'), b'odoo_base.aes-siv', hashlib.sha512).digest()
+    return AESSIV(key)
+
+def _siv_associated_data(purpose):
+    return [purpose.encode('utf-8')] if purpose else None
+
+def _siv_token(cipher, plaintext, associated_data):
+    # Empty fields (False, None, '') have no token: AES-SIV rejects empty data, and str()
+    # would turn Odoo's False into a token decrypting to 'False'
+    if plaintext is None or plaintext is False or plaintext == '':
+        return ''
+    ciphertext = cipher.encrypt(str(plaintext).encode('utf-8'), associated_data)
+    return base64.urlsafe_b64encode(ciphertext).rstrip(b'=').decode('ascii')
+
+def siv_encrypt(secret, plaintext, purpose=None):
+    """
+    Encrypt the given plaintext using deterministic authenticated encryption (AES-SIV).
+    The same plaintext, secret and purpose always give the same ciphertext, so rendered
+    output embedding it can be cached and compared. Equal plaintexts are therefore
+    recognizable: only use it for identifiers, never for secrets or low-entropy values
+    whose repetition matters, and prefer fernet_encrypt otherwise.
+
+    :param secret: The pre-shared secret string used to derive the encryption key.
+    :param plaintext: The value to encrypt; non-strings are converted with str().
+    :param purpose: Optional label (e.g. 'sale.order') bound to the ciphertext, so a token
+        issued for one purpose does not decrypt for another.
+    :returns: A URL-safe base64-encoded encrypted string, without padding, or '' when
+        the plaintext is empty (False, None or '').
+
+    Sources:
+        - https://cryptography.io/en/latest/hazmat/primitives/aead/#cryptography.hazmat.primitives.ciphers.aead.AESSIV
+    """
+    return _siv_token(_siv_cipher(secret), plaintext, _siv_associated_data(purpose))
+
+def siv_encrypt_batch(secret, plaintexts, purpose=None):
+    """
+    Encrypt many values with siv_encrypt, e.g. for a template looping over records.
+
+    :param secret: The pre-shared secret string used to derive the encryption key.
+    :param plaintexts: An iterable of values to encrypt.
+    :param purpose: Optional label bound to the ciphertexts, as for siv_encrypt.
+    :returns: A dict mapping each distinct value to its encrypted string ('' for empty values).
+    """
+    cipher = _siv_cipher(secret)
+    associated_data = _siv_associated_data(purpose)
+    result = {}
+    for plaintext in plaintexts:
+        if plaintext not in result:
+            result[plaintext] = _siv_token(cipher, plaintext, associated_data)
+    return result
+
+def siv_decrypt(secret, ciphertext, purpose=None):
+    """
+    Decrypt a ciphertext produced by siv_encrypt.
+
+    :param secret: The pre-shared secret string used to derive the decryption key.
+    :param ciphertext: The URL-safe base64-encoded encrypted string.
+    :param purpose: The label the value was encrypted with, if any.
+    :returns: The decrypted plaintext, or '' for the empty token of an empty value.
+    :raises AccessDenied: If decryption or authentication fails.
+    """
+    if not ciphertext:
+        return ''
+    try:
+        data = base64.urlsafe_b64decode(ciphertext + '=' * (-len(ciphertext) % 4))
+        plaintext = _siv_cipher(secret).decrypt(data, _siv_associated_data(purpose))
+    except Exception as e:
+        raise AccessDenied("Decryption failed.") from e
+    return plaintext.decode('utf-8')
+
 def _get_database_secret(env=None):
     """
     Retrieve the database secret ("database.secret").
@@ -3,4 +3,8 @@
 from . import tools
 from . import mail_thread
 from . import ir_attachment
-from . import abstracts
\ No newline at end of file
+from . import abstracts
+from . import request_metrics
+from . import query_detector
+from . import request_profiler
+from . import ir_http
@@ -16,3 +16,16 @@ class OdooBaseAbstracts(models.AbstractModel):
         """Encrypt a string using Fernet encryption with the database secret."""
         secret = fn._get_database_secret(self.env)
         return fn.fernet_encrypt(secret, plaintext)
+
+    @api.model
+    def siv_encrypt(self, plaintext, purpose=None):
+        """Encrypt a value deterministically (AES-SIV) with the database secret, so that
+        rendered output embedding it can be cached. Empty values give ''."""
+        secret = fn._get_database_secret(self.env)
+        return fn.siv_encrypt(secret, plaintext, purpose)
+
+    @api.model
+    def siv_encrypt_batch(self, plaintexts, purpose=None):
+        """Encrypt many values deterministically; returns a dict of value to ciphertext."""
+        secret = fn._get_database_secret(self.env)
+        return fn.siv_encrypt_batch(secret, plaintexts, purpose)
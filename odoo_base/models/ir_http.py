@@ -0,0 +1,31 @@
+from contextlib import ExitStack
+
+from odoo import models
+from odoo.http import request
+
+from odoo.addons.odoo_base.models.query_detector import QUERY_DETECTOR, warn_n_plus_one
+from odoo.addons.odoo_base.models.request_metrics import REQUEST_METRICS, ROUTE_KEY
+from odoo.addons.odoo_base.models.request_profiler import REQUEST_PROFILER, profile_request, requested_mode
+
+
+class IrHttp(models.AbstractModel):
+    _inherit = 'ir.http'
+
+    @classmethod
+    def _pre_dispatch(cls, rule, args):
+        """Label the request with its route pattern for the request metrics."""
+        if REQUEST_METRICS:
+            request.httprequest.environ[ROUTE_KEY] = rule.rule
+        super()._pre_dispatch(rule, args)
+
+    @classmethod
+    def _dispatch(cls, endpoint):
+        """Report the query shapes repeated while handling the request, and profile it
+        when an administrator asks for it."""
+        with ExitStack() as stack:
+            if QUERY_DETECTOR:
+                stack.enter_context(warn_n_plus_one(f"request {request.httprequest.path}"))
+            mode = REQUEST_PROFILER and requested_mode(request.httprequest)
+            if mode and request.env.uid and request.env.user.has_group('base.group_system'):
+                stack.enter_context(profile_request(request.httprequest, mode))
+            return super()._dispatch(endpoint)
@@ -0,0 +1,178 @@
+import functools
+import logging
+import os
+import re
+import sys
+import threading
+from contextlib import contextmanager
+
+from odoo import fields, models, sql_db
+from odoo.addons.odoo_base.__constants__ import IN_TEST_MODE
+from odoo.addons.odoo_base.__functions__ import str_to_bool
+
+_logger = logging.getLogger(__name__)
+
+"""
+N+1 query detection.
+
+Queries are normalized into shapes (literals and IN lists collapsed) and counted per
+scope; a shape issued more than QUERY_DETECTOR_THRESHOLD times within one scope is
+reported together with the model method that issued it.
+
+With QUERY_DETECTOR=true, every HTTP request and every computed field evaluation is a
+scope, and offending shapes are logged as warnings. In test mode the cursor hook is
+always installed so tests can assert on a block of code:
+
+    from odoo.addons.odoo_base.models.query_detector import assert_no_n_plus_one
+
+    with assert_no_n_plus_one(threshold=3):
+        partners._compute_portal_revoke_note()
+"""
+QUERY_DETECTOR = bool(str_to_bool(os.getenv('QUERY_DETECTOR', 'false')))
+QUERY_DETECTOR_THRESHOLD = int(os.getenv('QUERY_DETECTOR_THRESHOLD', '10'))
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST_RE = re.compile(r'\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+# Frames of these files are ORM/cursor plumbing, never the origin of a query
+_PLUMBING = tuple(os.path.join('odoo', name) for name in (
+    'sql_db.py', 'models.py', 'fields.py', 'api.py', 'tools', 'osv', 'modules', 'service',
+)) + (__file__.rsplit('.', 1)[0],)
+
+_state = threading.local()
+
+
+@functools.lru_cache(maxsize=4096)
+def query_shape(query):
+    """Normalize an SQL query so that executions differing only by their values compare equal."""
+    shape = _STRING_RE.sub('?', query)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _LIST_RE.sub('(...)', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+def _query_origin():
+    """Describe the first non-ORM frame that led to the current query, preferring model methods."""
+    frame, fallback = sys._getframe(2), None
+    while frame:
+        filename = frame.f_code.co_filename
+        if not any(part in filename for part in _PLUMBING):
+            location = f"{filename}:{frame.f_lineno}"
+            record = frame.f_locals.get('self')
+            if isinstance(record, models.BaseModel):
+                return f"{record._name}.{frame.f_code.co_name} ({location})"
+            fallback = fallback or f"{frame.f_code.co_name} ({location})"
+        frame = frame.f_back
+    return fallback or 'unknown'
+
+
+class QueryScope:
+    """Query shapes counted within one request, compute or assertion block."""
+
+    def __init__(self, label, threshold):
+        self.label = label
+        self.threshold = threshold
+        self.counts = {}
+        self.origins = {}
+
+    def record(self, shape):
+        count = self.counts[shape] = self.counts.get(shape, 0) + 1
+        if count == self.threshold + 1:
+            self.origins[shape] = _query_origin()
+
+    def offenders(self):
+        """The (shape, count, origin) of every shape issued more often than the threshold."""
+        return [(shape, count, self.origins.get(shape, 'unknown'))
+                for shape, count in self.counts.items() if count > self.threshold]
+
+    def report(self, offenders=None):
+        return '\n'.join(
+            [f"N+1 queries in {self.label}:"] +
+            [f"  {count}x by {origin}: {shape[:300]}"
+             for shape, count, origin in offenders or self.offenders()]
+        )
+
+
+@contextmanager
+def query_scope(label, threshold=None):
+    """Count the query shapes issued by the enclosed block, in addition to enclosing scopes."""
+    scopes = _state.__dict__.setdefault('scopes', [])
+    scope = QueryScope(label, QUERY_DETECTOR_THRESHOLD if threshold is None else threshold)
+    scopes.append(scope)
+    try:
+        yield scope
+    finally:
+        scopes.remove(scope)
+
+
+@contextmanager
+def warn_n_plus_one(label):
+    """Log the N+1 shapes of the enclosed block not already reported by a nested scope."""
+    with query_scope(label) as scope:
+        yield scope
+    reported = _state.__dict__.setdefault('reported', set())
+    offenders = [offender for offender in scope.offenders() if offender[0] not in reported]
+    if offenders:
+        _logger.warning(scope.report(offenders))
+        reported.update(shape for shape, _count, _origin in offenders)
+    if not _state.scopes:
+        reported.clear()
+
+
+@contextmanager
+def assert_no_n_plus_one(threshold=QUERY_DETECTOR_THRESHOLD, label='assertion block'):
+    """Fail with the offending shapes and methods when the block repeats a query shape."""
+    with query_scope(label, threshold) as scope:
+        yield scope
+    if scope.offenders():
+        raise AssertionError(scope.report())
+
+
+def _query_code(cr, query):
+    """The SQL text of a query given as str, bytes, odoo.tools.SQL or psycopg2.sql object."""
+    code = getattr(query, 'code', query)
+    if isinstance(code, bytes):
+        return code.decode()
+    if isinstance(code, str):
+        return code
+    try:
+        return query.as_string(cr._cnx)
+    except Exception:
+        # Not worth failing the query over: leave it out of the counts
+        return None
+
+
+# Save the original method for later use
+_original_execute = sql_db.Cursor.execute
+
+
+def counting_execute(self, query, params=None, log_exceptions=True):
+    """ Wraps Odoo's cursor execute to count query shapes in the active scopes. """
+    scopes = _state.__dict__.get('scopes')
+    if scopes:
+        code = _query_code(self, query)
+        if code is not None:
+            shape = query_shape(code)
+            for scope in scopes:
+                scope.record(shape)
+    return _original_execute(self, query, params, log_exceptions)
+
+
+# Save the original method for later use
+_original_compute_value = fields.Field.compute_value
+
+
+def scoped_compute_value(self, records):
+    """ Wraps computed field evaluation in its own detection scope. """
+    with warn_n_plus_one(f"compute of {records._name}.{self.name}"):
+        return _original_compute_value(self, records)
+
+
+if QUERY_DETECTOR or IN_TEST_MODE:
+    # Patch the methods
+    sql_db.Cursor.execute = counting_execute
+    if QUERY_DETECTOR:
+        fields.Field.compute_value = scoped_compute_value
+        _logger.info("N+1 query detector enabled (threshold %s)", QUERY_DETECTOR_THRESHOLD)
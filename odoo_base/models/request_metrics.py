@@ -0,0 +1,300 @@
+import fcntl
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from odoo import http
+from odoo.tools import config
+from odoo.addons.odoo_base.__functions__ import str_to_bool
+
+_logger = logging.getLogger(__name__)
+
+"""
+Opt-in per-route request metrics, exposed in the Prometheus text format.
+
+Every request served by this process is recorded under its route pattern (e.g.
+'/web/image/<string:xmlid>', not the raw path), with its status code, latency
+histogram, SQL query count and time, and response bytes. Each process keeps its
+counters in memory and periodically writes them to its own file in a spool
+directory; the metrics endpoint sums the files of every prefork worker, folding
+those of exited workers into a single file so counters never go backwards.
+
+Environment variables:
+    REQUEST_METRICS: enable the metrics (default false)
+    REQUEST_METRICS_PATH: URL of the endpoint (default /metrics), served before any
+        database is selected
+    REQUEST_METRICS_TOKEN: bearer token required by the endpoint; without it, only
+        loopback addresses may scrape it, and only when proxy_mode is off (behind a
+        reverse proxy every client may appear as a local address)
+    REQUEST_METRICS_DIR: spool directory (default <data_dir>/request_metrics)
+"""
+REQUEST_METRICS = bool(str_to_bool(os.getenv('REQUEST_METRICS', 'false')))
+METRICS_PATH = os.getenv('REQUEST_METRICS_PATH', '/metrics')
+METRICS_TOKEN = os.getenv('REQUEST_METRICS_TOKEN', '')
+SPOOL_DIR = os.getenv('REQUEST_METRICS_DIR') or os.path.join(config['data_dir'], 'request_metrics')
+
+# Seconds between two writes of a process' counters to the spool directory
+FLUSH_INTERVAL = 1.0
+
+# Upper bounds of the latency histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# environ key under which ir.http stores the matched route pattern
+ROUTE_KEY = 'odoo_base.route'
+
+RETIRED_FILE = 'retired.json'
+
+
+def _new_route():
+    return {'codes': {}, 'buckets': [0] * len(BUCKETS), 'count': 0, 'sum': 0.0,
+            'queries': 0, 'sql_time': 0.0, 'bytes': 0}
+
+
+def _merge(target, routes):
+    """Add the per-route counters of routes into target."""
+    for route, values in routes.items():
+        total = target.setdefault(route, _new_route())
+        for code, count in values['codes'].items():
+            total['codes'][code] = total['codes'].get(code, 0) + count
+        total['buckets'] = [a + b for a, b in zip(total['buckets'], values['buckets'])]
+        for key in ('count', 'sum', 'queries', 'sql_time', 'bytes'):
+            total[key] += values[key]
+    return target
+
+
+class RequestMetrics:
+    """Counters of the current process, flushed to <spool>/<pid>.json."""
+
+    def __init__(self, spool_dir):
+        self.spool_dir = spool_dir
+        self.routes = {}
+        self.lock = threading.Lock()
+        self.pid = None
+        self.last_flush = 0.0
+
+    def record(self, route, code, duration, queries, sql_time, size):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked worker: counters inherited from the parent are not ours
+                self.pid = os.getpid()
+                self.routes = {}
+                self.last_flush = 0.0
+            values = self.routes.get(route)
+            if values is None:
+                values = self.routes[route] = _new_route()
+            values['codes'][code] = values['codes'].get(code, 0) + 1
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    values['buckets'][index] += 1
+                    break
+            values['count'] += 1
+            values['sum'] += duration
+            values['queries'] += queries
+            values['sql_time'] += sql_time
+            values['bytes'] += size
+            now = time.monotonic()
+            if now - self.last_flush < FLUSH_INTERVAL:
+                return
+            self.last_flush = now
+            snapshot = json.dumps(self.routes)
+        self._write(snapshot)
+
+    def _write(self, snapshot):
+        try:
+            os.makedirs(self.spool_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', dir=self.spool_dir, suffix='.tmp', delete=False) as f:
+                f.write(snapshot)
+            os.replace(f.name, os.path.join(self.spool_dir, f'{self.pid}.json'))
+        except OSError as e:
+            _logger.warning("Could not write request metrics to %s: %s", self.spool_dir, e)
+
+    def collect(self):
+        """Sum the counters of every process, retiring those of exited processes."""
+        with self.lock:
+            snapshot = json.dumps(self.routes) if self.pid == os.getpid() else None
+        if snapshot:
+            self._write(snapshot)
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with open(os.path.join(self.spool_dir, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            retired_path = os.path.join(self.spool_dir, RETIRED_FILE)
+            retired = self._read(retired_path) or {}
+            live, changed = {}, False
+            for name in os.listdir(self.spool_dir):
+                pid = name[:-len('.json')]
+                if not (name.endswith('.json') and pid.isdigit()):
+                    continue
+                routes = self._read(os.path.join(self.spool_dir, name))
+                if routes is None:
+                    continue
+                if _pid_alive(int(pid)):
+                    _merge(live, routes)
+                else:
+                    _merge(retired, routes)
+                    os.unlink(os.path.join(self.spool_dir, name))
+                    changed = True
+            if changed:
+                with tempfile.NamedTemporaryFile('w', dir=self.spool_dir, suffix='.tmp', delete=False) as f:
+                    json.dump(retired, f)
+                os.replace(f.name, retired_path)
+        return _merge(live, retired)
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(routes):
+    """Render summed route counters in the Prometheus text exposition format."""
+    lines = [
+        '# HELP odoo_http_requests_total HTTP requests served, by route and status code.',
+        '# TYPE odoo_http_requests_total counter',
+    ]
+    for route, values in sorted(routes.items()):
+        for code, count in sorted(values['codes'].items()):
+            lines.append(f'odoo_http_requests_total{{route="{_label(route)}",code="{code}"}} {count}')
+
+    lines += [
+        '# HELP odoo_http_request_duration_seconds Time spent handling HTTP requests.',
+        '# TYPE odoo_http_request_duration_seconds histogram',
+    ]
+    for route, values in sorted(routes.items()):
+        label = _label(route)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, values['buckets']):
+            cumulative += count
+            lines.append(f'odoo_http_request_duration_seconds_bucket{{route="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'odoo_http_request_duration_seconds_bucket{{route="{label}",le="+Inf"}} {values["count"]}')
+        lines.append(f'odoo_http_request_duration_seconds_sum{{route="{label}"}} {values["sum"]:.6f}')
+        lines.append(f'odoo_http_request_duration_seconds_count{{route="{label}"}} {values["count"]}')
+
+    for name, key, kind, help_text in (
+        ('odoo_http_sql_queries_total', 'queries', 'counter', 'SQL queries issued while handling requests.'),
+        ('odoo_http_sql_seconds_total', 'sql_time', 'counter', 'Time spent in SQL queries while handling requests.'),
+        ('odoo_http_response_bytes_total', 'bytes', 'counter', 'Response body bytes served.'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for route, values in sorted(routes.items()):
+            value = values[key]
+            value = f'{value:.6f}' if isinstance(value, float) else value
+            lines.append(f'{name}{{route="{_label(route)}"}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+class _CountingIterable:
+    """Response body wrapper counting the bytes sent when no Content-Length is known."""
+
+    def __init__(self, app_iter, callback):
+        self.app_iter = app_iter
+        self.callback = callback
+        self.size = 0
+
+    def __iter__(self):
+        for chunk in self.app_iter:
+            self.size += len(chunk)
+            yield chunk
+
+    def close(self):
+        try:
+            if hasattr(self.app_iter, 'close'):
+                self.app_iter.close()
+        finally:
+            self.callback(self.size)
+
+
+def _fallback_route(path):
+    # Requests served without a routing rule: static assets, database manager, 404s
+    if '/static/' in path:
+        return '<static>'
+    return '<unrouted>'
+
+
+def _serve_metrics(environ, start_response):
+    # Runs before ProxyFix, so REMOTE_ADDR is the address of the proxy, if any
+    if METRICS_TOKEN:
+        allowed = hmac.compare_digest(environ.get('HTTP_AUTHORIZATION', ''), f'Bearer {METRICS_TOKEN}')
+    elif config['proxy_mode']:
+        allowed = False
+    else:
+        try:
+            allowed = ipaddress.ip_address(environ.get('REMOTE_ADDR', '')).is_loopback
+        except ValueError:
+            allowed = False
+    if not allowed:
+        start_response('403 Forbidden', [('Content-Type', 'text/plain')])
+        return [b'Forbidden\n']
+
+    body = render_prometheus(METRICS.collect()).encode()
+    start_response('200 OK', [('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+                              ('Content-Length', str(len(body)))])
+    return [body]
+
+
+METRICS = RequestMetrics(SPOOL_DIR)
+
+# Save the original method for later use
+_original_call = http.Application.__call__
+
+
+def metrics_call(self, environ, start_response):
+    """ Wraps Odoo's WSGI entry point to record the metrics of every request. """
+    if environ.get('PATH_INFO') == METRICS_PATH:
+        return _serve_metrics(environ, start_response)
+
+    started = time.perf_counter()
+    response = {}
+
+    def recording_start_response(status, headers, exc_info=None):
+        response['code'] = status.split(' ', 1)[0]
+        response['length'] = next((int(value) for name, value in headers
+                                   if name.lower() == 'content-length' and value.isdigit()), None)
+        return start_response(status, headers, exc_info)
+
+    app_iter = _original_call(self, environ, recording_start_response)
+
+    # Odoo counts the queries of the current request on its thread
+    duration = time.perf_counter() - started
+    thread = threading.current_thread()
+    queries = getattr(thread, 'query_count', 0)
+    sql_time = getattr(thread, 'query_time', 0.0)
+    route = environ.get(ROUTE_KEY) or _fallback_route(environ.get('PATH_INFO', ''))
+    code = response.get('code', '500')
+
+    def record(size):
+        METRICS.record(route, code, duration, queries, sql_time, size)
+
+    if response.get('length') is not None:
+        record(response['length'])
+        return app_iter
+    return _CountingIterable(app_iter, record)
+
+
+if REQUEST_METRICS:
+    # Patch the method
+    http.Application.__call__ = metrics_call
+    _logger.info("Request metrics enabled, served on %s (spool: %s)", METRICS_PATH, SPOOL_DIR)
+    if config['proxy_mode'] and not METRICS_TOKEN:
+        _logger.warning("Request metrics endpoint disabled: proxy_mode requires REQUEST_METRICS_TOKEN")
@@ -0,0 +1,132 @@
+import datetime
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from odoo.tools.profiler import Profiler
+from odoo.addons.odoo_base.__functions__ import str_to_bool
+from odoo.addons.odoo_base.models.query_detector import query_shape
+
+_logger = logging.getLogger(__name__)
+
+"""
+On-demand profiling of a single request, for members of base.group_system.
+
+A request sent with the 'X-Odoo-Profile' header or the 'odoo_profile' query parameter
+runs under Odoo's profiler, and its Python frames and SQL queries are written as
+collapsed stacks ('frame;frame;frame weight' lines, weights in microseconds) that
+flamegraph.pl, speedscope and inferno read directly:
+
+    <dir>/profile-<time>-<route>.frames.folded   time spent in Python frames
+    <dir>/profile-<time>-<route>.sql.folded      time spent in queries, by calling frame
+
+The value selects the mode: 'sample' (or any true value) samples the stack
+periodically, 'trace' records every Python call, which is exact but much slower.
+
+    curl -H 'X-Odoo-Profile: sample' -b session_id=... https://host/my/orders
+
+Environment variables:
+    REQUEST_PROFILER: allow profiling requests (default true)
+    REQUEST_PROFILER_DIR: output directory (default /home/odoo/.logs)
+    REQUEST_PROFILER_INTERVAL: seconds between two samples (default 0.005)
+"""
+REQUEST_PROFILER = bool(str_to_bool(os.getenv('REQUEST_PROFILER', 'true')))
+PROFILE_DIR = os.getenv('REQUEST_PROFILER_DIR', '/home/odoo/.logs')
+SAMPLE_INTERVAL = float(os.getenv('REQUEST_PROFILER_INTERVAL', '0.005'))
+
+PROFILE_HEADER = 'X-Odoo-Profile'
+PROFILE_PARAM = 'odoo_profile'
+
+# Profiler collectors of each mode
+MODES = {
+    'sample': ['sql', 'traces_async'],
+    'trace': ['sql', 'traces_sync'],
+}
+
+_SLUG_RE = re.compile(r'[^A-Za-z0-9]+')
+
+
+def requested_mode(httprequest):
+    """The profiling mode asked for by the request, or None."""
+    value = httprequest.headers.get(PROFILE_HEADER) or httprequest.args.get(PROFILE_PARAM)
+    if not value:
+        return None
+    value = value.strip().lower()
+    if value in MODES:
+        return value
+    return 'sample' if str_to_bool(value) else None
+
+
+def _frame_name(frame):
+    filename, lineno, name = frame[0], frame[1], frame[2]
+    for marker in ('/addons/', '/odoo/'):
+        if marker in filename:
+            filename = filename.rsplit(marker, 1)[1]
+            break
+    # ';' separates frames and ' ' the weight in the collapsed format
+    return f"{name} ({filename}:{lineno})".replace(';', ',').replace(' ', '_')
+
+
+def _folded(stack, leaf=None):
+    frames = [_frame_name(frame) for frame in stack]
+    if leaf:
+        frames.append(leaf)
+    return ';'.join(frames) or 'root'
+
+
+def collapse_frames(entries, interval):
+    """Weight each stack sample by the time until the next one."""
+    stacks = {}
+    for entry, following in zip(entries, entries[1:] + [None]):
+        duration = following['start'] - entry['start'] if following else interval
+        key = _folded(entry.get('stack') or [])
+        stacks[key] = stacks.get(key, 0) + duration
+    return stacks
+
+
+def collapse_sql(entries):
+    """Weight each query shape, under the frame that issued it, by its execution time."""
+    stacks = {}
+    for entry in entries:
+        leaf = 'SQL ' + query_shape(entry['query']).replace(';', ',').replace(' ', '_')[:200]
+        key = _folded(entry.get('stack') or [], leaf)
+        stacks[key] = stacks.get(key, 0) + entry['time']
+    return stacks
+
+
+def _write_folded(path, stacks):
+    with open(path, 'w') as f:
+        for stack, seconds in sorted(stacks.items()):
+            weight = round(seconds * 1_000_000)
+            if weight:
+                f.write(f"{stack} {weight}\n")
+
+
+@contextmanager
+def profile_request(httprequest, mode):
+    """Profile the enclosed dispatch and write its collapsed stacks; yields the output prefix."""
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    slug = _SLUG_RE.sub('-', httprequest.path).strip('-')[:60] or 'root'
+    prefix = os.path.join(PROFILE_DIR, f'profile-{stamp}-{slug}')
+
+    profiler = Profiler(collectors=MODES[mode], db=None, description=httprequest.path,
+                        params={'traces_async_interval': SAMPLE_INTERVAL})
+    started = time.perf_counter()
+    with profiler:
+        yield prefix
+    duration = time.perf_counter() - started
+
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        for collector in profiler.collectors:
+            if collector.name == 'sql':
+                _write_folded(f'{prefix}.sql.folded', collapse_sql(collector.entries))
+            else:
+                _write_folded(f'{prefix}.frames.folded', collapse_frames(collector.entries, SAMPLE_INTERVAL))
+    except OSError as e:
+        _logger.warning("Could not write the profile of %s to %s: %s", httprequest.path, PROFILE_DIR, e)
+        return
+    _logger.info("Profiled %s (%s mode, %.3fs): %s.{frames,sql}.folded",
+                 httprequest.path, mode, duration, prefix)